@@ -0,0 +1,4 @@
+"""Benchmarks of src functions and pipeline services on synthetic WHO-schema data.
+
+Usage: python -m benchmarks --scales 1,10 [--services all] [--save-baseline]
+"""
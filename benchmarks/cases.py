@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+import pandas as pd
+
+from src.data_load import load_data
+from src.data_quality_analysis import generate_quality_report
+from src.data_research import (
+    calculate_correlation_with_target,
+    prepare_data_for_modeling,
+    train_linear_regression,
+    train_random_forest,
+)
+from src.synthetic_data import write_synthetic_csv
+from src.visualization import (
+    plot_correlation_matrix,
+    plot_distribution,
+    plot_distributions,
+    plot_grouped_comparison,
+    plot_missing_values,
+    plot_scatter_with_regression,
+)
+
+TARGET = "Life expectancy "
+
+# Pipeline services in dependency order; each reads the previous stages' outputs
+SERVICE_STAGES = ("data_load", "data_quality_analysis", "data_research", "visualization")
+
+
+class BenchmarkData:
+    """Synthetic dataset of one scale, with derived inputs built lazily and reused by cases."""
+
+    def __init__(self, scale: float, data_dir: str | Path, random_state: int = 42) -> None:
+        self.scale = scale
+        self.data_dir = Path(data_dir)
+        self.random_state = random_state
+        self._df: pd.DataFrame | None = None
+        self._split: tuple | None = None
+
+    @property
+    def csv_path(self) -> Path:
+        # Outside data/raw: generated files are scratch data (or a reusable --data-dir cache)
+        path = self.data_dir / f"Life Expectancy Data x{self.scale:g}.csv"
+        if not path.exists():
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            write_synthetic_csv(path, scale=self.scale, random_state=self.random_state)
+        return path
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = pd.read_csv(self.csv_path)
+        return self._df
+
+    @property
+    def split(self) -> tuple:
+        if self._split is None:
+            X_train, X_test, y_train, y_test, _ = prepare_data_for_modeling(self.df, target=TARGET)
+            self._split = (X_train, y_train, X_test, y_test)
+        return self._split
+
+
+class Case(NamedTuple):
+    """
+    name: case name used in results and baselines
+    func: measured function
+    inputs: builds positional and keyword arguments from BenchmarkData (not measured)
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Callable[[BenchmarkData], tuple[tuple, dict]]
+
+
+def _df_only(data: BenchmarkData) -> tuple[tuple, dict]:
+    return (data.df,), {}
+
+
+FUNCTION_CASES = [
+    Case("load_data", load_data, lambda data: ((str(data.csv_path),), {"copy_to_canonical": False})),
+    Case("generate_quality_report", generate_quality_report, _df_only),
+    Case("prepare_data_for_modeling", prepare_data_for_modeling, lambda data: ((data.df,), {"target": TARGET})),
+    Case("train_linear_regression", train_linear_regression, lambda data: (data.split, {})),
+    Case("train_random_forest", train_random_forest, lambda data: (data.split, {})),
+    Case(
+        "calculate_correlation_with_target",
+        calculate_correlation_with_target,
+        lambda data: ((data.df,), {"target": TARGET}),
+    ),
+    Case("plot_missing_values", plot_missing_values, lambda data: ((data.df,), {"save": True})),
+    Case(
+        "plot_distribution",
+        plot_distribution,
+        lambda data: ((data.df,), {"column": TARGET, "save": True, "filename": "bench_distribution.png"}),
+    ),
+    Case("plot_distributions", plot_distributions, lambda data: ((data.df,), {"save": True})),
+    Case("plot_correlation_matrix", plot_correlation_matrix, lambda data: ((data.df,), {"save": True})),
+    Case(
+        "plot_scatter_with_regression",
+        plot_scatter_with_regression,
+        lambda data: (
+            (data.df,),
+            {"x_col": "Schooling", "y_col": TARGET, "save": True, "filename": "bench_scatter.png"},
+        ),
+    ),
+    Case(
+        "plot_grouped_comparison",
+        plot_grouped_comparison,
+        lambda data: (
+            (data.df,),
+            {"group_col": "Country", "value_col": TARGET, "save": True, "filename": "bench_grouped.png"},
+        ),
+    ),
+]
@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from services.common import write_json
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT_DIR = ROOT / "runtime" / "benchmarks" / "load"
+
+# path:weight pairs; "figure" and "chart" pick a random figure / chart discovered on the running app
+DEFAULT_MIX = "/:5,/metrics:1,figure:3,chart:2,/api/rows?limit=50:2,/health:1"
+PERCENTILES = (50, 95, 99)
+
+
+def parse_mix(value: str) -> list[tuple[str, float]]:
+    mix = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        path, _, weight = item.rpartition(":")
+        if not path or not weight.replace(".", "", 1).isdigit():
+            path, weight = item, "1"
+        mix.append((path, float(weight)))
+    return mix
+
+
+def _fetch(url: str, timeout: float = 10.0) -> bytes:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def discover_targets(base_url: str) -> dict[str, list[str]]:
+    # Real figure URLs (with ?v= versions) as the dashboard links them; chart names from the API
+    html = _fetch(base_url + "/").decode("utf-8", errors="replace")
+    figures = sorted(set(re.findall(r'(?:src|href)="(/figures/[^"]+)"', html)))
+    try:
+        charts = json.loads(_fetch(base_url + "/api/charts")).get("charts", [])
+    except (OSError, ValueError):
+        charts = []
+    return {
+        "figure": [path.replace("&amp;", "&") for path in figures],
+        "chart": [f"/api/charts/{name}" for name in charts],
+    }
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams (reconnects when the server closes)."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host, self.port = host, port
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def _close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, path: str) -> tuple[int, int]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            "Accept-Encoding: gzip, br\r\nConnection: keep-alive\r\n\r\n".encode("latin-1")
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        version, status = status_line.split()[:2]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        size = 0
+        if headers.get("transfer-encoding") == "chunked":
+            while True:
+                chunk_size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(chunk_size + 2)
+                size += chunk_size
+                if chunk_size == 0:
+                    break
+        elif "content-length" in headers:
+            size = int(headers["content-length"])
+            await self.reader.readexactly(size)
+        elif int(status) not in (204, 304):
+            size = len(await self.reader.read())
+
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection") != "close"
+        if not keep_alive or ("content-length" not in headers and headers.get("transfer-encoding") != "chunked"):
+            await self._close()
+        return int(status), size
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.bytes: Counter = Counter()
+
+    def add(self, route: str, latency: float, status: int | str, size: int = 0) -> None:
+        self.latencies[route].append(latency)
+        self.statuses[route][str(status)] += 1
+        self.bytes[route] += size
+
+
+def _latency_stats(values: list[float]) -> dict:
+    data = np.asarray(values) * 1000
+    stats = {f"p{p}_ms": round(float(np.percentile(data, p)), 3) for p in PERCENTILES}
+    stats.update(mean_ms=round(float(data.mean()), 3), max_ms=round(float(data.max()), 3))
+    return stats
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    def block(latencies: list[float], statuses: Counter, size: int) -> dict:
+        count = sum(statuses.values())
+        errors = sum(n for status, n in statuses.items() if not status.isdigit() or int(status) >= 500)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "statuses": dict(statuses),
+            "bytes": size,
+            **(_latency_stats(latencies) if latencies else {}),
+        }
+
+    routes = {
+        route: block(recorder.latencies[route], recorder.statuses[route], recorder.bytes[route])
+        for route in sorted(recorder.latencies)
+    }
+    total_statuses = sum(recorder.statuses.values(), Counter())
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    return {"overall": block(all_latencies, total_statuses, sum(recorder.bytes.values())), "routes": routes}
+
+
+async def run_load(
+    base_url: str,
+    mix: list[tuple[str, float]],
+    concurrency: int = 10,
+    duration: float = 30.0,
+    rate: float = 0.0,
+    warmup: float = 2.0,
+    seed: int = 42,
+) -> dict:
+    """Closed loop (``rate=0``: each connection sends back to back) or open loop at ``rate`` requests/s.
+
+    In the open loop latency is measured from the scheduled send time, so queueing behind a
+    saturated server is included instead of hidden (no coordinated omission).
+    """
+    url = urlsplit(base_url)
+    targets = discover_targets(base_url)
+    weighted = [(path, weight) for path, weight in mix if path not in targets or targets[path]]
+    skipped = [path for path, _ in mix if path in targets and not targets[path]]
+    if not weighted:
+        raise ValueError("Nothing to request: the mix is empty or no figures/charts were found")
+    paths, weights = zip(*weighted)
+    rng = random.Random(seed)
+
+    def pick() -> tuple[str, str]:
+        route = rng.choices(paths, weights)[0]
+        return route, rng.choice(targets[route]) if route in targets else route
+
+    recorder = Recorder()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+    tickets: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        connection = HttpConnection(url.hostname, url.port or 80)
+        while True:
+            if rate > 0:
+                scheduled = await tickets.get()
+                if scheduled is None:
+                    break
+            else:
+                scheduled = loop.time()
+                if scheduled >= stop_at:
+                    break
+            route, path = pick()
+            try:
+                status, size = await connection.request(path)
+            except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+                status, size = type(e).__name__, 0
+                await connection._close()
+            finished = loop.time()
+            if scheduled >= measure_from:
+                recorder.add(route, finished - scheduled, status, size)
+        await connection._close()
+
+    async def dispatcher() -> None:
+        interval = 1.0 / rate
+        next_at = start
+        while next_at < stop_at:
+            await asyncio.sleep(max(0.0, next_at - loop.time()))
+            tickets.put_nowait(next_at)
+            next_at += interval
+        for _ in range(concurrency):
+            tickets.put_nowait(None)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    if rate > 0:
+        tasks.append(asyncio.create_task(dispatcher()))
+    await asyncio.gather(*tasks)
+    elapsed = min(loop.time(), stop_at) - measure_from if rate <= 0 else duration
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "url": base_url,
+            "mix": dict(mix),
+            "concurrency": concurrency,
+            "duration_seconds": duration,
+            "warmup_seconds": warmup,
+            "rate_rps": rate or None,
+            "mode": "open" if rate > 0 else "closed",
+            "skipped_routes": skipped,
+            "discovered": {name: len(items) for name, items in targets.items()},
+        },
+        **summarize(recorder, elapsed),
+    }
+
+
+def compare_with_baseline(current: dict, baseline: dict, threshold: float = 0.2) -> list[dict]:
+    """Latency percentiles and error rate must not grow, throughput must not drop, by more than ``threshold``.
+
+    Throughput is only compared between closed-loop runs: in the open loop it is the requested rate.
+    """
+    comparisons = []
+    closed = current["config"]["mode"] == baseline.get("config", {}).get("mode") == "closed"
+    sections = [("overall", current["overall"], baseline.get("overall", {}))] + [
+        (route, item, baseline.get("routes", {}).get(route, {})) for route, item in current["routes"].items()
+    ]
+    for name, item, base in sections:
+        for metric in [f"p{p}_ms" for p in PERCENTILES] + ["throughput_rps", "error_rate"]:
+            value, reference = item.get(metric), base.get(metric)
+            if value is None or reference is None or (metric == "throughput_rps" and not closed):
+                continue
+            if metric == "throughput_rps":
+                regression = reference > 0 and value < reference * (1 - threshold)
+            elif metric == "error_rate":
+                regression = value > reference + 0.01
+            else:
+                # Sub-millisecond differences are noise
+                regression = value > reference * (1 + threshold) and value - reference > 1.0
+            comparisons.append(
+                {"route": name, "metric": metric, "baseline": reference, "current": value, "regression": regression}
+            )
+    return comparisons
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(timeout: float = 30.0) -> tuple[subprocess.Popen, str]:
+    # A separate process, so the load generator does not compete with the app for the GIL
+    port = _free_port()
+    env = {**os.environ, "WEB_PORT": str(port), "PYTHONPATH": str(ROOT)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "services.web.app"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Web app exited with code {process.returncode}")
+        try:
+            _fetch(base_url + "/health", timeout=1.0)
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise TimeoutError("Web app did not become healthy in time")
+
+
+def _print_report(report: dict, comparisons: list[dict] | None) -> None:
+    header = f"{'route':<28}{'reqs':>8}{'rps':>9}{'err%':>7}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+    print("\n" + header)
+    for name, item in [("overall", report["overall"]), *report["routes"].items()]:
+        print(
+            f"{name:<28}{item['requests']:>8}{item['throughput_rps']:>9.1f}{item['error_rate'] * 100:>7.2f}"
+            + "".join(f"{item.get(f'p{p}_ms', 0):>10.2f}" for p in PERCENTILES)
+        )
+    if comparisons is not None:
+        regressions = [item for item in comparisons if item["regression"]]
+        print(f"\nCompared {len(comparisons)} metrics with the baseline: {len(regressions)} regression(s)")
+        for item in regressions:
+            print(f"  REGRESSION {item['route']} {item['metric']}: {item['baseline']} -> {item['current']}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test for the web service")
+    parser.add_argument("--url", default=None, help="base URL of a running app, e.g. http://localhost:8080")
+    parser.add_argument("--serve", action="store_true", help="start services.web.app locally (uses the same env)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted routes (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=10, help="parallel connections")
+    parser.add_argument("--rate", type=float, default=0.0, help="target requests/s (0 = as fast as possible)")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds excluded from the results")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--baseline", default=None, help="results JSON of a previous build to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative change, e.g. 0.2 = 20%%")
+    args = parser.parse_args(argv)
+
+    if not args.url and not args.serve:
+        parser.error("either --url or --serve is required")
+
+    # Read before latest.json is overwritten, it may be the baseline itself
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+
+    server = None
+    base_url = (args.url or "").rstrip("/")
+    if args.serve:
+        server, base_url = start_local_server()
+    try:
+        report = asyncio.run(
+            run_load(
+                base_url,
+                parse_mix(args.mix),
+                concurrency=args.concurrency,
+                duration=args.duration,
+                rate=args.rate,
+                warmup=args.warmup,
+            )
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    output_dir = Path(args.output_dir)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = write_json(output_dir / f"load_{stamp}.json", report)
+    write_json(output_dir / "latest.json", report)
+
+    comparisons = None
+    if baseline is not None:
+        comparisons = compare_with_baseline(report, baseline, threshold=args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "metrics": comparisons}
+        write_json(output, report)
+
+    _print_report(report, comparisons)
+    print(f"Results saved to: {output}")
+    return 1 if comparisons and any(item["regression"] for item in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
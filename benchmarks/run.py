@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Figures and chart data are always re-rendered (into the work directory, see run_benchmarks)
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ["PLOT_SHOW"] = "0"
+os.environ["FIGURE_CACHE"] = "0"
+os.environ["ANALYTICS_CACHE_DIR"] = ""
+
+from benchmarks.cases import FUNCTION_CASES, SERVICE_STAGES, BenchmarkData, Case  # noqa: E402
+from services.common import write_json  # noqa: E402
+
+DEFAULT_OUTPUT_DIR = ROOT / "runtime" / "benchmarks"
+
+
+def _measure_function(case: Case, data: BenchmarkData, repeats: int, max_seconds: float) -> dict:
+    args, kwargs = case.inputs(data)
+    walls, cpus = [], []
+    # Output of the measured functions (progress prints) is not part of the benchmark
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeats):
+            gc.collect()
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            case.func(*args, **kwargs)
+            walls.append(time.perf_counter() - wall_start)
+            cpus.append(time.process_time() - cpu_start)
+            if sum(walls) >= max_seconds:
+                break
+
+        # Peak memory in a separate run: tracemalloc slows the code down and would skew timings
+        gc.collect()
+        tracemalloc.start()
+        try:
+            case.func(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "kind": "function",
+        "repeats": len(walls),
+        "wall_seconds": round(min(walls), 6),
+        "wall_seconds_median": round(statistics.median(walls), 6),
+        "cpu_seconds": round(min(cpus), 6),
+        "peak_bytes": int(peak),
+        "peak_kind": "tracemalloc",
+    }
+
+
+def _measure_services(data: BenchmarkData, stages: list[str], work_dir: Path) -> dict[str, dict]:
+    runtime = work_dir / f"services_x{data.scale:g}"
+    results_dir = runtime / "results"
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "CSV_FILE": str(data.csv_path),
+        "SQLITE_PATH": str(runtime / "db" / "life_expectancy.db"),
+        "LOAD_SUMMARY_PATH": str(results_dir / "load_summary.json"),
+        "QUALITY_REPORT_PATH": str(results_dir / "quality_report.json"),
+        "RESEARCH_REPORT_PATH": str(results_dir / "research_report.json"),
+        "FIGURES_DIR": str(results_dir / "figures"),
+        "CHARTS_DIR": str(results_dir / "charts"),
+        "TELEMETRY_DIR": str(results_dir / "telemetry"),
+        "PUSHGATEWAY_URL": "",
+        "TELEMETRY_TEXTFILE_DIR": "",
+    }
+
+    measured = {}
+    for stage in SERVICE_STAGES:
+        if stage not in stages:
+            continue
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-m", f"services.{stage}.app"], cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        wall = time.perf_counter() - start
+        if completed.returncode != 0:
+            raise RuntimeError(f"Service '{stage}' failed:\n{completed.stderr[-2000:]}")
+
+        # Stage time and memory come from the service's own telemetry (see pipeline_stage)
+        telemetry = json.loads((results_dir / "telemetry" / f"{stage}.json").read_text(encoding="utf-8"))
+        measured[f"service:{stage}"] = {
+            "kind": "service",
+            "repeats": 1,
+            "wall_seconds": telemetry["wall_seconds"],
+            "process_wall_seconds": round(wall, 6),
+            "cpu_seconds": round(telemetry["cpu_seconds"] + telemetry["children_cpu_seconds"], 6),
+            "peak_bytes": telemetry["peak_rss_bytes"],
+            "peak_kind": "rss",
+            "steps": {step["name"]: step["wall_seconds"] for step in telemetry["steps"]},
+        }
+    return measured
+
+
+def run_benchmarks(
+    scales: list[float],
+    cases: list[str] | None = None,
+    services: list[str] | None = None,
+    repeats: int = 3,
+    max_seconds: float = 10.0,
+    work_dir: str | Path | None = None,
+    data_dir: str | Path | None = None,
+) -> dict:
+    """Run the function cases and services at each scale; scratch output goes to ``work_dir``.
+
+    Without ``work_dir`` a temporary directory is used and removed afterwards. Synthetic CSVs
+    are generated into ``data_dir`` (kept and reused between runs) or, by default, ``work_dir``.
+    """
+    if work_dir is None:
+        with tempfile.TemporaryDirectory(prefix="odaa-bench-") as tmp:
+            return run_benchmarks(scales, cases, services, repeats, max_seconds, work_dir=tmp, data_dir=data_dir)
+
+    work_dir = Path(work_dir)
+    data_dir = Path(data_dir) if data_dir is not None else work_dir / "data"
+    os.environ["FIGURES_DIR"] = str(work_dir / "figures")
+    os.environ["CHARTS_DIR"] = str(work_dir / "charts")
+    selected = [case for case in FUNCTION_CASES if cases is None or case.name in cases]
+    results = {}
+    for scale in scales:
+        data = BenchmarkData(scale, data_dir)
+        rows = len(data.df)
+        for case in selected:
+            print(f"[x{scale:g}] {case.name} ...", flush=True)
+            results[f"{case.name}@x{scale:g}"] = {
+                "case": case.name,
+                "scale": scale,
+                "rows": rows,
+                **_measure_function(case, data, repeats, max_seconds),
+            }
+        if services:
+            print(f"[x{scale:g}] services: {', '.join(services)} ...", flush=True)
+            for name, item in _measure_services(data, services, work_dir).items():
+                results[f"{name}@x{scale:g}"] = {"case": name, "scale": scale, "rows": rows, **item}
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "scales": scales,
+        "results": results,
+    }
+
+
+def compare_with_baseline(
+    current: dict,
+    baseline: dict,
+    threshold: float = 0.2,
+    min_seconds: float = 0.05,
+    min_bytes: int = 1 << 20,
+) -> list[dict]:
+    """Compare results case by case; a metric regresses when it grows by more than
+    ``threshold`` and by more than an absolute floor (noise on tiny cases is ignored)."""
+    comparisons = []
+    for key, item in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        for metric, floor in (("wall_seconds", min_seconds), ("peak_bytes", min_bytes)):
+            value, reference = item.get(metric), base.get(metric)
+            if value is None or not reference:
+                continue
+            ratio = value / reference
+            comparisons.append(
+                {
+                    "key": key,
+                    "metric": metric,
+                    "baseline": reference,
+                    "current": value,
+                    "ratio": round(ratio, 3),
+                    "regression": ratio > 1 + threshold and value - reference > floor,
+                }
+            )
+    return comparisons
+
+
+def _format_value(metric: str, value: float) -> str:
+    return f"{value:.3f}s" if metric == "wall_seconds" else f"{value / 2**20:.1f}MiB"
+
+
+def _print_results(report: dict, comparisons: list[dict] | None) -> None:
+    print(f"\n{'case':<52}{'rows':>10}{'time':>11}{'peak':>12}")
+    for key, item in report["results"].items():
+        print(
+            f"{key:<52}{item['rows']:>10}{_format_value('wall_seconds', item['wall_seconds']):>11}"
+            f"{_format_value('peak_bytes', item['peak_bytes'] or 0):>12}"
+        )
+    if comparisons is None:
+        return
+    regressions = [item for item in comparisons if item["regression"]]
+    print(f"\nCompared {len(comparisons)} metrics with the baseline: {len(regressions)} regression(s)")
+    for item in regressions:
+        print(
+            f"  REGRESSION {item['key']} {item['metric']}: "
+            f"{_format_value(item['metric'], item['baseline'])} -> {_format_value(item['metric'], item['current'])} "
+            f"(x{item['ratio']})"
+        )
+
+
+def _csv_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark src functions and pipeline services on synthetic data")
+    parser.add_argument("--scales", default="1,10", help="dataset scales relative to the real data, e.g. 1,10,100")
+    parser.add_argument("--cases", default=None, help="function cases to run (default: all; 'none' to skip)")
+    parser.add_argument(
+        "--services", default="", help=f"service stages to run, or 'all' ({', '.join(SERVICE_STAGES)})"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="maximum timed repeats per case")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="stop repeating a case after this long")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument(
+        "--work-dir", default=None, help="keep scratch figures and service runtimes here (default: temporary, removed)"
+    )
+    parser.add_argument(
+        "--data-dir", default=None, help="keep and reuse the generated CSVs here (default: inside the work directory)"
+    )
+    parser.add_argument("--baseline", default=None, help="baseline JSON (default: <output-dir>/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative growth, e.g. 0.2 = +20%%")
+    args = parser.parse_args(argv)
+
+    cases = None if args.cases is None else [c for c in _csv_list(args.cases) if c != "none"]
+    services = list(SERVICE_STAGES) if args.services == "all" else _csv_list(args.services)
+    report = run_benchmarks(
+        [float(scale) for scale in _csv_list(args.scales)],
+        cases=cases,
+        services=services,
+        repeats=args.repeats,
+        max_seconds=args.max_seconds,
+        work_dir=args.work_dir,
+        data_dir=args.data_dir,
+    )
+
+    output_dir = Path(args.output_dir)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    write_json(output_dir / f"results_{stamp}.json", report)
+    write_json(output_dir / "latest.json", report)
+
+    baseline_path = Path(args.baseline) if args.baseline else output_dir / "baseline.json"
+    comparisons = None
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        comparisons = compare_with_baseline(report, baseline, threshold=args.threshold)
+        write_json(output_dir / f"comparison_{stamp}.json", {"baseline": str(baseline_path), "metrics": comparisons})
+
+    _print_results(report, comparisons)
+    if args.save_baseline:
+        write_json(baseline_path, report)
+        print(f"\nBaseline saved to: {baseline_path}")
+    print(f"Results saved to: {output_dir / f'results_{stamp}.json'}")
+
+    return 1 if comparisons and any(item["regression"] for item in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,40 @@
 from __future__ import annotations
 
+import ctypes
+import ctypes.util
+import functools
+import hashlib
 import json
 import math
 import os
+import select
 import sqlite3
+import sys
+import threading
 import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 
 import pandas as pd
 
+try:
+    from src.profiling import start_profiling, write_profiles
+except ImportError:  # images without src/ (e.g. web): stages are then not profiled
+
+    def start_profiling(name: str) -> None:
+        pass
+
+    def write_profiles(name: str | None = None) -> dict[str, str]:
+        return {}
+
+try:
+    import resource
+except ImportError:  # not available on Windows: peak RSS is then not reported
+    resource = None
+
 
 def get_env(name: str, default: str | None = None, required: bool = False) -> str:
     value = os.getenv(name, default)
@@ -30,16 +55,6 @@ def ensure_dir(path: str | Path) -> Path:
     return dir_path
 
 
-def wait_for_file(path: str | Path, timeout: int = 120, interval: float = 2.0) -> Path:
-    target = Path(path)
-    start = time.time()
-    while time.time() - start <= timeout:
-        if target.exists():
-            return target
-        time.sleep(interval)
-    raise TimeoutError(f"Timed out waiting for file: {target}")
-
-
 def load_dataframe_from_sqlite(sqlite_path: str | Path, table_name: str) -> pd.DataFrame:
     db_path = Path(sqlite_path)
     if not db_path.exists():
@@ -87,8 +102,434 @@ def to_builtin(value: Any) -> Any:
     return value
 
 
+def _fsync_dir(path: Path) -> None:
+    # Makes the rename itself durable; directories cannot be opened for fsync on Windows
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_output(path: str | Path) -> Iterator[Path]:
+    """Yield a temporary path next to ``path``; once written it is fsynced and renamed over ``path``.
+
+    Readers see either the previous file or the complete new one, never a partial write.
+    On failure the temporary file is removed and ``path`` is left untouched.
+    """
+    target = ensure_parent(path)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        yield tmp_path
+        fd = os.open(tmp_path, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    _fsync_dir(target.parent)
+
+
 def write_json(path: str | Path, payload: dict[str, Any]) -> Path:
-    file_path = ensure_parent(path)
-    with file_path.open("w", encoding="utf-8") as f:
-        json.dump(to_builtin(payload), f, ensure_ascii=False, indent=2)
-    return file_path
+    with atomic_output(path) as tmp_path:
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(to_builtin(payload), f, ensure_ascii=False, indent=2)
+    return Path(path)
+
+
+ARTIFACT_MARKER_SUFFIX = ".done"
+
+
+def artifact_marker_path(path: str | Path) -> Path:
+    target = Path(path)
+    return target.with_name(target.name + ARTIFACT_MARKER_SUFFIX)
+
+
+def file_fingerprint(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return f"sha256:{digest.hexdigest()}"
+
+
+def publish_artifact(path: str | Path) -> Path:
+    """Mark a completely written artifact as ready for downstream stages.
+
+    The marker ``<name>.done`` next to it records the content fingerprint, size and mtime,
+    so a marker left over from an earlier file is not taken for the current one.
+    """
+    target = Path(path)
+    stat = target.stat()
+    marker = {
+        "path": str(target),
+        "fingerprint": file_fingerprint(target),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "stage": _active_stage.stage if _active_stage is not None else None,
+        "run_id": os.getenv("PIPELINE_RUN_ID") or None,
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return write_json(artifact_marker_path(target), marker)
+
+
+def retract_artifacts(paths: Iterable[str | Path]) -> None:
+    """Remove the completion markers of artifacts that are about to be produced again.
+
+    Called by the first stage of a run for its own and all downstream artifacts, so markers
+    left in a persistent runtime volume by an earlier run cannot satisfy this run's waiters.
+    """
+    for path in paths:
+        artifact_marker_path(path).unlink(missing_ok=True)
+
+
+# (path, size, mtime_ns, fingerprint) of files whose content was already checked against their marker
+_verified_artifacts: set[tuple[str, int, int, str]] = set()
+
+
+def read_artifact_marker(path: str | Path) -> dict[str, Any] | None:
+    """The completion marker of ``path`` if it describes the file currently there, else None.
+
+    Size and mtime are compared on every call; the content fingerprint is verified once per
+    file version in this process (hashing a large database on every poll would be too slow).
+    """
+    target = Path(path)
+    try:
+        marker = json.loads(artifact_marker_path(target).read_text(encoding="utf-8"))
+        stat = target.stat()
+    except (OSError, ValueError):
+        return None
+    if marker.get("size") != stat.st_size or marker.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+
+    key = (str(target), stat.st_size, stat.st_mtime_ns, str(marker.get("fingerprint")))
+    if key not in _verified_artifacts:
+        try:
+            if file_fingerprint(target) != marker.get("fingerprint"):
+                return None
+        except OSError:
+            return None
+        _verified_artifacts.add(key)
+    return marker
+
+
+class _Inotify:
+    """Minimal inotify(7) binding: wakes up when a file is written, created or moved into a watched directory."""
+
+    # IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    MASK = 0x00000008 | 0x00000080 | 0x00000100
+
+    def __init__(self, fd: int) -> None:
+        self.fd = fd
+
+    @classmethod
+    def watch(cls, directories: Iterable[Path]) -> _Inotify | None:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        for directory in directories:
+            if libc.inotify_add_watch(fd, os.fsencode(directory), cls.MASK) < 0:
+                os.close(fd)
+                return None
+        return cls(fd)
+
+    def wait(self, timeout: float) -> None:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            # Events only wake the waiter up; the markers themselves are checked again
+            try:
+                os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def wait_for_artifacts(paths: Iterable[str | Path], timeout: float = 180.0, poll_interval: float = 0.5) -> list[Path]:
+    """Block until every artifact is published (see ``publish_artifact``).
+
+    On Linux the parent directories are watched with inotify, so the wait ends as soon as the
+    last marker is written. Without inotify the markers are polled every ``poll_interval``
+    seconds; with it the same interval is a safety net for mounts that do not deliver events.
+    """
+    targets = [Path(path) for path in paths]
+    deadline = time.monotonic() + timeout
+    # Watching starts before the first check, so a marker written in between is not missed
+    watcher = _Inotify.watch({ensure_dir(target.parent) for target in targets})
+    try:
+        while True:
+            missing = [target for target in targets if read_artifact_marker(target) is None]
+            if not missing:
+                return targets
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timed out waiting for artifacts: {', '.join(map(str, missing))}")
+            if watcher is not None:
+                watcher.wait(min(remaining, poll_interval))
+            else:
+                time.sleep(min(remaining, poll_interval))
+    finally:
+        if watcher is not None:
+            watcher.close()
+
+
+TELEMETRY_METRIC_PREFIX = "odaa_pipeline"
+
+
+def _peak_rss_bytes(who: int | None = None) -> int | None:
+    if who is None:
+        # VmHWM covers only this program; ru_maxrss also keeps the parent's peak across fork + exec
+        try:
+            with open("/proc/self/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return int(resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss) * 1024
+
+
+def _children_cpu_seconds() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class StageTelemetry:
+    """Wall time, CPU time and peak memory of one pipeline stage and its named steps.
+
+    CPU time includes finished child processes (process pools). Steps may nest and may
+    run in threads; concurrent steps overlap in CPU time. Peak RSS is a process-wide
+    high-water mark, so a step records how much it raised it (0 if it stayed below). With ``trace_memory`` the peak
+    of Python allocations (tracemalloc) is recorded too, per step only on the main thread.
+    """
+
+    def __init__(self, stage: str, trace_memory: bool = False) -> None:
+        self.stage = stage
+        self.trace_memory = trace_memory
+        self.steps: list[dict[str, Any]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_at = datetime.now(timezone.utc)
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._children_cpu_start = _children_cpu_seconds()
+        self._traced_peak = 0
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _traces_step(self) -> bool:
+        return self.trace_memory and threading.current_thread() is threading.main_thread()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        stack = self._local.__dict__.setdefault("stack", [])
+        frame = {"name": name, "traced_peak": 0}
+        if self._traces_step():
+            # The enclosing step keeps its peak so far; the new step starts from the current usage
+            peak = tracemalloc.get_traced_memory()[1]
+            for parent in stack:
+                parent["traced_peak"] = max(parent["traced_peak"], peak)
+            self._traced_peak = max(self._traced_peak, peak)
+            tracemalloc.reset_peak()
+        stack.append(frame)
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        rss_start = _peak_rss_bytes()
+        status = "failed"
+        try:
+            yield
+            status = "completed"
+        finally:
+            stack.pop()
+            record = {
+                "name": name,
+                "status": status,
+                "parent": stack[-1]["name"] if stack else None,
+                "wall_seconds": round(time.perf_counter() - wall_start, 6),
+                "cpu_seconds": round(time.process_time() - cpu_start, 6),
+            }
+            # The RSS high-water mark is per process: a step can only report how far it raised it
+            rss_end = _peak_rss_bytes()
+            if rss_start is not None and rss_end is not None:
+                record["peak_rss_growth_bytes"] = rss_end - rss_start
+            if self._traces_step():
+                peak = max(frame["traced_peak"], tracemalloc.get_traced_memory()[1])
+                for parent in stack:
+                    parent["traced_peak"] = max(parent["traced_peak"], peak)
+                self._traced_peak = max(self._traced_peak, peak)
+                record["traced_peak_bytes"] = peak
+            with self._lock:
+                self.steps.append(record)
+
+    def summary(self, status: str) -> dict[str, Any]:
+        summary = {
+            "stage": self.stage,
+            "status": status,
+            "run_id": get_env("PIPELINE_RUN_ID", self._started_at.strftime("%Y%m%dT%H%M%SZ")),
+            "started_at": self._started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "pid": os.getpid(),
+            "wall_seconds": round(time.perf_counter() - self._wall_start, 6),
+            "cpu_seconds": round(time.process_time() - self._cpu_start, 6),
+            "children_cpu_seconds": round(_children_cpu_seconds() - self._children_cpu_start, 6),
+            "peak_rss_bytes": _peak_rss_bytes(),
+            "children_peak_rss_bytes": _peak_rss_bytes(resource.RUSAGE_CHILDREN) if resource else None,
+            "steps": list(self.steps),
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            summary["traced_peak_bytes"] = max(self._traced_peak, tracemalloc.get_traced_memory()[1])
+        return summary
+
+
+def _telemetry_registry(summary: dict[str, Any]):
+    from prometheus_client import CollectorRegistry, Gauge
+
+    registry = CollectorRegistry()
+    prefix = TELEMETRY_METRIC_PREFIX
+    labels = {"stage": summary["stage"]}
+    gauges: dict[str, Any] = {}
+
+    def gauge(name: str, help_text: str, value: Any, extra: dict[str, str] | None = None) -> None:
+        if value is None:
+            return
+        metric_labels = {**labels, **(extra or {})}
+        metric = gauges.get(name)
+        if metric is None:
+            metric = gauges[name] = Gauge(f"{prefix}_{name}", help_text, list(metric_labels), registry=registry)
+        metric.labels(**metric_labels).set(value)
+
+    gauge("stage_success", "1 if the last run of the stage completed", int(summary["status"] == "completed"))
+    gauge("stage_last_run_timestamp_seconds", "End time of the last run", time.time())
+    gauge("stage_duration_seconds", "Wall time of the last run", summary["wall_seconds"])
+    gauge(
+        "stage_cpu_seconds",
+        "CPU time of the last run, including child processes",
+        summary["cpu_seconds"] + summary["children_cpu_seconds"],
+    )
+    gauge("stage_peak_rss_bytes", "Peak resident memory of the stage process", summary["peak_rss_bytes"])
+    gauge(
+        "stage_children_peak_rss_bytes",
+        "Peak resident memory of the largest child process",
+        summary["children_peak_rss_bytes"] or None,
+    )
+    gauge("stage_traced_peak_bytes", "Peak of Python allocations (tracemalloc)", summary.get("traced_peak_bytes"))
+
+    # Repeated step names (e.g. one step per target) are summed
+    steps: dict[str, dict[str, float]] = {}
+    for item in summary["steps"]:
+        totals = steps.setdefault(item["name"], {"wall": 0.0, "cpu": 0.0})
+        totals["wall"] += item["wall_seconds"]
+        totals["cpu"] += item["cpu_seconds"]
+    for name, totals in steps.items():
+        gauge("step_duration_seconds", "Wall time of a stage step in the last run", totals["wall"], {"step": name})
+        gauge("step_cpu_seconds", "CPU time of a stage step in the last run", totals["cpu"], {"step": name})
+    return registry
+
+
+def publish_telemetry(summary: dict[str, Any]) -> dict[str, str]:
+    """Write the run telemetry JSON and export it to Pushgateway / textfile collector if configured.
+
+    Export failures are reported but never fail the stage.
+    """
+    telemetry_dir = Path(get_env("TELEMETRY_DIR", "/app/runtime/results/telemetry"))
+    outputs = {"json": str(write_json(telemetry_dir / f"{summary['stage']}.json", summary))}
+    # History of all runs, one JSON object per line, for comparing runs over time
+    with (telemetry_dir / "runs.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps(to_builtin(summary), ensure_ascii=False) + "\n")
+    outputs["history"] = str(telemetry_dir / "runs.jsonl")
+
+    pushgateway_url = get_env("PUSHGATEWAY_URL", "").strip()
+    textfile_dir = get_env("TELEMETRY_TEXTFILE_DIR", "").strip()
+    if not pushgateway_url and not textfile_dir:
+        return outputs
+
+    try:
+        from prometheus_client import push_to_gateway, write_to_textfile
+
+        registry = _telemetry_registry(summary)
+        if pushgateway_url:
+            push_to_gateway(
+                pushgateway_url,
+                job=TELEMETRY_METRIC_PREFIX,
+                grouping_key={"stage": summary["stage"]},
+                registry=registry,
+                timeout=5,
+            )
+            outputs["pushgateway"] = pushgateway_url
+        if textfile_dir:
+            path = ensure_dir(textfile_dir) / f"{TELEMETRY_METRIC_PREFIX}_{summary['stage']}.prom"
+            write_to_textfile(str(path), registry)
+            outputs["textfile"] = str(path)
+    except Exception as e:
+        print(f"Warning: failed to export telemetry for stage '{summary['stage']}': {e}")
+    return outputs
+
+
+_active_stage: StageTelemetry | None = None
+
+
+@contextmanager
+def stage_step(name: str) -> Iterator[None]:
+    """Time a step of the running stage; does nothing outside a ``pipeline_stage``."""
+    if _active_stage is None:
+        yield
+        return
+    with _active_stage.step(name):
+        yield
+
+
+def pipeline_stage(stage: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator for a service entry point: records and publishes its telemetry, also on failure."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            global _active_stage
+
+            trace_memory = get_env("TELEMETRY_TRACEMALLOC", "0").strip().lower() in {"1", "true", "yes"}
+            telemetry = StageTelemetry(stage, trace_memory=trace_memory)
+            previous, _active_stage = _active_stage, telemetry
+            # Profiles of src functions (PROFILE) are written per stage, next to the telemetry
+            start_profiling(stage)
+            status = "failed"
+            try:
+                result = func(*args, **kwargs)
+                status = "completed"
+                return result
+            finally:
+                _active_stage = previous
+                summary = telemetry.summary(status)
+                profiles = write_profiles(stage)
+                if profiles:
+                    summary["profiles"] = profiles
+                try:
+                    outputs = publish_telemetry(summary)
+                    print(f"Stage '{stage}' {status} in {summary['wall_seconds']:.2f}s. Telemetry: {outputs['json']}")
+                except OSError as e:
+                    print(f"Warning: failed to write telemetry for stage '{stage}': {e}")
+
+        return wrapper
+
+    return decorator
@@ -5,14 +5,53 @@ from pathlib import Path
 
 import pandas as pd
 
-from services.common import get_env, ensure_parent, write_json
+from services.common import (
+    atomic_output,
+    get_env,
+    pipeline_stage,
+    publish_artifact,
+    retract_artifacts,
+    stage_step,
+    write_json,
+)
 
+# Indexes for keyset pagination and filters of the web /api/rows endpoint
+INDEXES = {
+    "country_year": ("Country", "Year"),
+    "status_country_year": ("Status", "Country", "Year"),
+    "year": ("Year",),
+}
 
-def main() -> None:
+
+def _create_indexes(conn: sqlite3.Connection, table_name: str, columns: list[str]) -> list[str]:
+    created = []
+    for suffix, index_columns in INDEXES.items():
+        if not set(index_columns).issubset(columns):
+            continue
+        index_name = f"ix_{table_name}_{suffix}"
+        column_list = ", ".join(f'"{col}"' for col in index_columns)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table_name}" ({column_list})')
+        created.append(index_name)
+    # Table/index statistics for the query planner and row-count estimates
+    conn.execute("ANALYZE")
+    return created
+
+
+@pipeline_stage("data_load")
+def main() -> pd.DataFrame:
     csv_file = Path(get_env("CSV_FILE", "/app/data/raw/Life Expectancy Data.csv"))
     sqlite_path = Path(get_env("SQLITE_PATH", "/app/runtime/db/life_expectancy.db"))
     table_name = get_env("DB_TABLE", "life_expectancy")
     summary_path = Path(get_env("LOAD_SUMMARY_PATH", "/app/runtime/results/load_summary.json"))
+    # Downstream stages wait for these markers: those from an earlier run must not count for this one
+    retract_artifacts(
+        [
+            sqlite_path,
+            summary_path,
+            get_env("QUALITY_REPORT_PATH", "/app/runtime/results/quality_report.json"),
+            get_env("RESEARCH_REPORT_PATH", "/app/runtime/results/research_report.json"),
+        ]
+    )
 
     if not csv_file.exists():
         raise FileNotFoundError(
@@ -20,11 +59,21 @@ def main() -> None:
             "Mount your dataset into the container and update CSV_FILE if needed."
         )
 
-    df = pd.read_csv(csv_file)
-    ensure_parent(sqlite_path)
+    with stage_step("read_csv"):
+        df = pd.read_csv(csv_file)
 
-    with sqlite3.connect(sqlite_path) as conn:
-        df.to_sql(table_name, conn, if_exists="replace", index=False)
+    # Built in a temporary file and renamed into place: readers never open a half-written database
+    with atomic_output(sqlite_path) as tmp_path:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            with conn:
+                with stage_step("write_sqlite"):
+                    df.to_sql(table_name, conn, if_exists="replace", index=False)
+                with stage_step("create_indexes"):
+                    indexes = _create_indexes(conn, table_name, list(df.columns))
+        finally:
+            conn.close()
+    publish_artifact(sqlite_path)
 
     summary = {
         "status": "completed",
@@ -34,10 +83,13 @@ def main() -> None:
         "rows_loaded": int(len(df)),
         "columns_count": int(len(df.columns)),
         "columns": list(df.columns),
+        "indexes": indexes,
     }
 
     output = write_json(summary_path, summary)
+    publish_artifact(output)
     print(f"Data load completed. Rows loaded: {len(df)}. Summary: {output}")
+    return df
 
 
 if __name__ == "__main__":
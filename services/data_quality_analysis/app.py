@@ -2,8 +2,18 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pandas as pd
+
 from src.data_quality_analysis import generate_quality_report
-from services.common import get_env, load_dataframe_from_sqlite, wait_for_file, write_json
+from services.common import (
+    get_env,
+    load_dataframe_from_sqlite,
+    pipeline_stage,
+    publish_artifact,
+    stage_step,
+    wait_for_artifacts,
+    write_json,
+)
 
 
 def _serialize_quality_report(report: dict) -> dict:
@@ -33,17 +43,25 @@ def _serialize_quality_report(report: dict) -> dict:
     }
 
 
-def main() -> None:
+@pipeline_stage("data_quality_analysis")
+def main(df: pd.DataFrame | None = None) -> None:
     sqlite_path = Path(get_env("SQLITE_PATH", "/app/runtime/db/life_expectancy.db"))
     table_name = get_env("DB_TABLE", "life_expectancy")
     quality_report_path = Path(get_env("QUALITY_REPORT_PATH", "/app/runtime/results/quality_report.json"))
 
-    wait_for_file(sqlite_path, timeout=180, interval=2.0)
-    df = load_dataframe_from_sqlite(sqlite_path, table_name)
+    # The in-process pipeline runner passes the loaded dataset directly
+    if df is None:
+        with stage_step("wait_for_inputs"):
+            wait_for_artifacts([sqlite_path], timeout=180)
+        with stage_step("load_dataframe"):
+            df = load_dataframe_from_sqlite(sqlite_path, table_name)
 
-    report = generate_quality_report(df)
-    serialized = _serialize_quality_report(report)
-    output = write_json(quality_report_path, serialized)
+    with stage_step("quality_report"):
+        report = generate_quality_report(df)
+    with stage_step("write_report"):
+        serialized = _serialize_quality_report(report)
+        output = write_json(quality_report_path, serialized)
+        publish_artifact(output)
 
     print(f"Data quality analysis completed. Report saved to: {output}")
 
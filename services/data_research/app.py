@@ -2,15 +2,29 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pandas as pd
+
+from src.chart_data import predictions_chart, write_chart_data
 from src.data_research import (
+    bootstrap_model_metrics,
     calculate_correlation_with_target,
     compare_models,
     get_feature_importance,
-    prepare_data_for_modeling,
+    prepare_shared_modeling_data,
+    split_shared_modeling_data,
+    train_grouped_models,
     train_linear_regression,
     train_random_forest,
 )
-from services.common import get_env, load_dataframe_from_sqlite, wait_for_file, write_json
+from services.common import (
+    get_env,
+    load_dataframe_from_sqlite,
+    pipeline_stage,
+    publish_artifact,
+    stage_step,
+    wait_for_artifacts,
+    write_json,
+)
 
 
 def _extract_metrics(results: dict) -> dict:
@@ -20,27 +34,56 @@ def _extract_metrics(results: dict) -> dict:
     }
 
 
-def main() -> None:
-    sqlite_path = Path(get_env("SQLITE_PATH", "/app/runtime/db/life_expectancy.db"))
-    table_name = get_env("DB_TABLE", "life_expectancy")
-    target_column = get_env("TARGET_COLUMN", "Life expectancy ")
-    report_path = Path(get_env("RESEARCH_REPORT_PATH", "/app/runtime/results/research_report.json"))
-
-    wait_for_file(sqlite_path, timeout=180, interval=2.0)
-    df = load_dataframe_from_sqlite(sqlite_path, table_name)
-
-    if target_column not in df.columns:
-        normalized_map = {col.strip(): col for col in df.columns}
-        fallback = normalized_map.get(target_column.strip())
-        if fallback:
-            target_column = fallback
-        else:
-            raise ValueError(f"Target column '{target_column}' was not found in table '{table_name}'")
-
-    X_train, X_test, y_train, y_test, features = prepare_data_for_modeling(df, target=target_column)
-
-    linear_results = train_linear_regression(X_train, y_train, X_test, y_test)
-    forest_results = train_random_forest(X_train, y_train, X_test, y_test)
+def _run_grouped_models(df: pd.DataFrame, target_column: str, features: pd.DataFrame | None = None) -> dict:
+    group_columns = [col.strip() for col in get_env("GROUP_BY", "").split(",") if col.strip()]
+    model_type = get_env("GROUP_MODEL", "random_forest")
+    min_group_size = int(get_env("GROUP_MIN_SIZE", "10"))
+    workers = int(get_env("GROUP_WORKERS", "0")) or None
+
+    grouped = {}
+    for group_col in group_columns:
+        if group_col not in df.columns:
+            print(f"Skipping grouped training: column '{group_col}' was not found")
+            continue
+
+        metrics_df = train_grouped_models(
+            df,
+            group_col=group_col,
+            target=target_column,
+            model_type=model_type,
+            min_group_size=min_group_size,
+            n_jobs=workers,
+            features=features,
+        )
+        grouped[group_col] = {
+            "model_type": model_type,
+            "min_group_size": min_group_size,
+            "groups_count": int(len(metrics_df)),
+            "fallback_groups": int((metrics_df["model"] == "global").sum()),
+            "groups": metrics_df.to_dict(orient="records"),
+        }
+    return grouped
+
+
+def _resolve_target(df: pd.DataFrame, target_column: str, table_name: str) -> str:
+    if target_column in df.columns:
+        return target_column
+
+    normalized_map = {col.strip(): col for col in df.columns}
+    fallback = normalized_map.get(target_column.strip())
+    if fallback:
+        return fallback
+    raise ValueError(f"Target column '{target_column}' was not found in table '{table_name}'")
+
+
+def _research_target(df: pd.DataFrame, shared: dict, target_column: str, charts_dir: Path) -> dict:
+    X_train, X_test, y_train, y_test, features, preprocessor = split_shared_modeling_data(
+        shared, target_column
+    )
+
+    with stage_step("train_models"):
+        linear_results = train_linear_regression(X_train, y_train, X_test, y_test, preprocessor=preprocessor)
+        forest_results = train_random_forest(X_train, y_train, X_test, y_test, preprocessor=preprocessor)
 
     model_results = {
         "Linear Regression": linear_results,
@@ -50,16 +93,41 @@ def main() -> None:
     comparison_df = compare_models(model_results)
     best_model = comparison_df.sort_values("Test R²", ascending=False).iloc[0]["Model"]
 
+    n_resamples = int(get_env("BOOTSTRAP_RESAMPLES", "1000"))
+    confidence = float(get_env("BOOTSTRAP_CONFIDENCE", "0.95"))
+    with stage_step("bootstrap"):
+        bootstrap = bootstrap_model_metrics(
+            model_results,
+            y_test,
+            n_resamples=n_resamples,
+            confidence=confidence,
+            chunk_size=int(get_env("BOOTSTRAP_CHUNK_SIZE", "200")),
+        )
+
+    slug = "_".join(target_column.strip().lower().replace("/", " ").replace("-", " ").split())
+    write_chart_data(
+        f"model_predictions_{slug}",
+        {
+            **predictions_chart(y_test, model_results[best_model]["predictions"]["y_test_pred"]),
+            "model": best_model,
+            "target_column": target_column,
+        },
+        charts_dir=charts_dir,
+    )
+
     correlation_df = calculate_correlation_with_target(df, target=target_column, top_n=10)
     importance_df = get_feature_importance(forest_results, top_n=10)
+    with stage_step("grouped_models"):
+        grouped_models = _run_grouped_models(df, target_column, features=shared["X"])
 
-    report = {
+    return {
         "status": "completed",
         "target_column": target_column,
         "rows_total": int(len(df)),
         "features_count": int(len(features)),
         "train_rows": int(len(X_train)),
         "test_rows": int(len(X_test)),
+        "preprocessing": preprocessor.to_dict(),
         "models": {
             "Linear Regression": _extract_metrics(linear_results),
             "Random Forest": {
@@ -69,14 +137,61 @@ def main() -> None:
         },
         "comparison": comparison_df.to_dict(orient="records"),
         "best_model": best_model,
+        "bootstrap": {
+            "n_resamples": n_resamples,
+            "confidence": confidence,
+            "intervals": bootstrap["intervals"].to_dict(orient="records"),
+            "differences": bootstrap["differences"].to_dict(orient="records"),
+        },
         "top_correlations": correlation_df.to_dict(orient="records"),
         "top_feature_importance": (
             importance_df.to_dict(orient="records") if importance_df is not None else []
         ),
+        "grouped_models": grouped_models,
+    }
+
+
+@pipeline_stage("data_research")
+def main(df: pd.DataFrame | None = None) -> None:
+    sqlite_path = Path(get_env("SQLITE_PATH", "/app/runtime/db/life_expectancy.db"))
+    table_name = get_env("DB_TABLE", "life_expectancy")
+    target_column = get_env("TARGET_COLUMN", "Life expectancy ")
+    target_columns = [col for col in get_env("TARGET_COLUMNS", "").split(",") if col.strip()]
+    report_path = Path(get_env("RESEARCH_REPORT_PATH", "/app/runtime/results/research_report.json"))
+    charts_dir = Path(get_env("CHARTS_DIR", "/app/runtime/results/charts"))
+
+    # The in-process pipeline runner passes the loaded dataset directly
+    if df is None:
+        with stage_step("wait_for_inputs"):
+            wait_for_artifacts([sqlite_path], timeout=180)
+        with stage_step("load_dataframe"):
+            df = load_dataframe_from_sqlite(sqlite_path, table_name)
+
+    # The first target is the primary one: its report stays at the top level of research_report.json
+    targets = []
+    for column in [target_column, *target_columns]:
+        resolved = _resolve_target(df, column, table_name)
+        if resolved not in targets:
+            targets.append(resolved)
+
+    # Feature matrix and train/test split are built once and shared by all targets
+    with stage_step("prepare_shared_data"):
+        shared = prepare_shared_modeling_data(df, targets)
+
+    # Targets one after another: each fit already uses all cores (RF n_jobs=-1, grouped process
+    # pool), and forking the grouped pool from a process with several busy threads can deadlock
+    with stage_step("research_targets"):
+        target_reports = {target: _research_target(df, shared, target, charts_dir) for target in targets}
+
+    report = {
+        **target_reports[targets[0]],
+        "target_columns": targets,
+        "targets": target_reports,
     }
 
     output = write_json(report_path, report)
-    print(f"Data research completed. Report saved to: {output}")
+    publish_artifact(output)
+    print(f"Data research completed for {len(targets)} target(s). Report saved to: {output}")
 
 
 if __name__ == "__main__":
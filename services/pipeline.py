@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+import pandas as pd
+
+# Imported once here: stages forked from this process start with pandas, sklearn and matplotlib loaded
+from services.common import get_env, load_dataframe_from_sqlite, pipeline_stage
+from services.data_load.app import main as data_load
+from services.data_quality_analysis.app import main as data_quality_analysis
+from services.data_research.app import main as data_research
+from services.visualization.app import main as visualization
+
+# Stage -> (entry point, stages it depends on); the same order the compose services wait for each other
+STAGES: dict[str, tuple[Callable[..., Any], tuple[str, ...]]] = {
+    "data_load": (data_load, ()),
+    "data_quality_analysis": (data_quality_analysis, ("data_load",)),
+    "data_research": (data_research, ("data_load",)),
+    "visualization": (visualization, ("data_quality_analysis", "data_research")),
+}
+
+
+def _fork_context():
+    # Forked workers share the loaded dataset copy-on-write; without fork stages run one by one
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _load_dataset() -> pd.DataFrame:
+    # Only needed when data_load is not part of this run
+    sqlite_path = get_env("SQLITE_PATH", "/app/runtime/db/life_expectancy.db")
+    return load_dataframe_from_sqlite(sqlite_path, get_env("DB_TABLE", "life_expectancy"))
+
+
+def _run_stage(name: str, df: pd.DataFrame | None) -> Any:
+    entry_point, _ = STAGES[name]
+    return entry_point() if name == "data_load" else entry_point(df)
+
+
+def run_pipeline(stages: list[str] | None = None, max_workers: int | None = None) -> dict[str, float]:
+    """Run the stages as a DAG in this process and forked workers; returns wall seconds per stage.
+
+    A stage starts as soon as the stages it depends on have finished. Ready stages that can run
+    together go to forked workers; a stage that is the only one left to run stays in this process.
+    Stages outside ``stages`` are treated as already done (their artifacts must exist).
+    """
+    selected = [name for name in STAGES if stages is None or name in stages]
+    unknown = sorted(set(stages or []) - set(STAGES))
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+
+    context = _fork_context()
+    max_workers = max_workers or len(selected)
+    df: pd.DataFrame | None = None
+    pending = list(selected)
+    done: set[str] = set(STAGES) - set(selected)
+    running: dict[Any, tuple[str, Any, float]] = {}
+    durations: dict[str, float] = {}
+    failed: list[str] = []
+
+    while pending or running:
+        ready = [name for name in pending if set(STAGES[name][1]) <= done] if not failed else []
+        if df is None and any(name != "data_load" for name in ready):
+            df = _load_dataset()
+
+        if ready and not running and (len(ready) == 1 or context is None or max_workers == 1):
+            name = ready[0]
+            pending.remove(name)
+            start = time.perf_counter()
+            result = _run_stage(name, df)
+            durations[name] = round(time.perf_counter() - start, 3)
+            if name == "data_load":
+                df = result
+            done.add(name)
+            continue
+
+        for name in ready[: max(max_workers - len(running), 0)]:
+            pending.remove(name)
+            # Buffered output would otherwise be printed again by the child
+            sys.stdout.flush()
+            sys.stderr.flush()
+            process = context.Process(target=_run_stage, args=(name, df), name=f"pipeline-{name}")
+            process.start()
+            running[process.sentinel] = (name, process, time.perf_counter())
+
+        if not running:
+            # Nothing can start: dependencies of the remaining stages failed
+            break
+        for sentinel in multiprocessing.connection.wait(list(running)):
+            name, process, start = running.pop(sentinel)
+            process.join()
+            durations[name] = round(time.perf_counter() - start, 3)
+            if process.exitcode == 0:
+                done.add(name)
+            else:
+                print(f"Pipeline stage '{name}' failed with exit code {process.exitcode}")
+                failed.append(name)
+
+    if failed or pending:
+        skipped = f"; not started: {', '.join(pending)}" if pending else ""
+        raise RuntimeError(f"Pipeline failed in stage(s): {', '.join(failed)}{skipped}")
+    return durations
+
+
+@pipeline_stage("pipeline")
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the pipeline stages in one process tree")
+    parser.add_argument("--stages", default="", help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(get_env("PIPELINE_WORKERS", "0")),
+        help="maximum stages running at the same time (0 = as many as are ready)",
+    )
+    args = parser.parse_args(argv)
+
+    # One run id for the telemetry of all stages of this run
+    os.environ.setdefault("PIPELINE_RUN_ID", datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+    stages = [name.strip() for name in args.stages.split(",") if name.strip()] or None
+    durations = run_pipeline(stages, max_workers=args.workers or None)
+    print("Pipeline completed: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in durations.items()))
+
+
+if __name__ == "__main__":
+    main()
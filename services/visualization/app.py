@@ -6,37 +6,69 @@ from pathlib import Path
 os.environ.setdefault("MPLBACKEND", "Agg")
 os.environ.setdefault("PLOT_SHOW", "0")
 
-from src.visualization import (  # noqa: E402
-    plot_correlation_matrix,
-    plot_distribution,
-    plot_missing_values,
-    setup_plot_style,
-)
-from services.common import get_env, load_dataframe_from_sqlite, wait_for_file
+import pandas as pd  # noqa: E402
 
+from src.visualization import FigureJob, export_chart_data, render_figures  # noqa: E402
+from services.common import get_env, load_dataframe_from_sqlite, pipeline_stage, stage_step, wait_for_artifacts
 
-def main() -> None:
+
+def _figure_jobs(df: pd.DataFrame) -> list[FigureJob]:
+    jobs = [FigureJob("plot_missing_values", "missing_values.png")]
+
+    if "Life expectancy " in df.columns:
+        jobs.append(
+            FigureJob("plot_distribution", "distribution_life_expectancy.png", {"column": "Life expectancy "})
+        )
+
+    # Усі числові стовпці - сторінками малих графіків, а не окремою фігурою на стовпець
+    if get_env("PLOT_ALL_DISTRIBUTIONS", "0").strip().lower() in {"1", "true", "yes"}:
+        jobs.append(FigureJob("plot_distributions", "distributions.png"))
+        if "Life expectancy " in df.columns:
+            jobs.append(FigureJob("plot_scatter_matrix", "scatter_matrix.png", {"target": "Life expectancy "}))
+
+    jobs.append(FigureJob("plot_correlation_matrix", "correlation_matrix.png"))
+
+    if {"Country", "Life expectancy "}.issubset(df.columns):
+        jobs.append(
+            FigureJob(
+                "plot_grouped_comparison",
+                "grouped_country_life_expectancy.png",
+                {"group_col": "Country", "value_col": "Life expectancy "},
+            )
+        )
+    return jobs
+
+
+@pipeline_stage("visualization")
+def main(df: pd.DataFrame | None = None) -> None:
     sqlite_path = Path(get_env("SQLITE_PATH", "/app/runtime/db/life_expectancy.db"))
     table_name = get_env("DB_TABLE", "life_expectancy")
     quality_report_path = Path(get_env("QUALITY_REPORT_PATH", "/app/runtime/results/quality_report.json"))
     research_report_path = Path(get_env("RESEARCH_REPORT_PATH", "/app/runtime/results/research_report.json"))
     figures_dir = Path(get_env("FIGURES_DIR", "/app/runtime/results/figures"))
+    charts_dir = Path(get_env("CHARTS_DIR", "/app/runtime/results/charts"))
 
     os.environ["FIGURES_DIR"] = str(figures_dir)
+    os.environ["CHARTS_DIR"] = str(charts_dir)
 
-    wait_for_file(sqlite_path, timeout=180, interval=2.0)
-    wait_for_file(quality_report_path, timeout=180, interval=2.0)
-    wait_for_file(research_report_path, timeout=180, interval=2.0)
+    # The in-process pipeline runner passes the loaded dataset once the reports are written
+    if df is None:
+        with stage_step("wait_for_inputs"):
+            wait_for_artifacts([sqlite_path, quality_report_path, research_report_path], timeout=180)
 
-    df = load_dataframe_from_sqlite(sqlite_path, table_name)
+        with stage_step("load_dataframe"):
+            df = load_dataframe_from_sqlite(sqlite_path, table_name)
 
-    setup_plot_style()
-    plot_missing_values(df, save=True, filename="missing_values.png")
-
-    if "Life expectancy " in df.columns:
-        plot_distribution(df, "Life expectancy ", save=True, filename="distribution_life_expectancy.png")
+    jobs = _figure_jobs(df)
+    workers = int(get_env("RENDER_WORKERS", "0")) or None
+    with stage_step("render_figures"):
+        manifest = render_figures(df, jobs, max_workers=workers)
+    with stage_step("export_chart_data"):
+        export_chart_data(df, jobs)
 
-    plot_correlation_matrix(df, save=True, filename="correlation_matrix.png")
+    failed = [item["name"] for item in manifest["figures"] if item["status"] == "error"]
+    if failed:
+        raise RuntimeError(f"Failed to render figures: {', '.join(failed)}")
     print(f"Visualizations generated in: {figures_dir}")
 
 
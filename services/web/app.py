@@ -1,13 +1,41 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import csv
+import gzip
+import hashlib
+import io
 import json
-import sqlite3
+import math
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
 from pathlib import Path
 
-import pandas as pd
-from flask import Flask, jsonify, render_template, send_from_directory
+from flask import (
+    Flask,
+    Response,
+    abort,
+    jsonify,
+    render_template,
+    request,
+    send_from_directory,
+    url_for,
+)
+from werkzeug.security import safe_join
 
 from services.common import get_env
+from services.web.cache import ArtifactCache, file_signature
+from services.web import metrics
+from services.web.db import ReadOnlyPool, quote_identifier, rows_to_records
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are gzip-compressed only
+    brotli = None
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
@@ -17,6 +45,48 @@ LOAD_SUMMARY_PATH = Path(get_env("LOAD_SUMMARY_PATH", "/app/runtime/results/load
 QUALITY_REPORT_PATH = Path(get_env("QUALITY_REPORT_PATH", "/app/runtime/results/quality_report.json"))
 RESEARCH_REPORT_PATH = Path(get_env("RESEARCH_REPORT_PATH", "/app/runtime/results/research_report.json"))
 FIGURES_DIR = Path(get_env("FIGURES_DIR", "/app/runtime/results/figures"))
+FIGURES_MANIFEST_PATH = FIGURES_DIR / "figures_manifest.json"
+CHARTS_DIR = Path(get_env("CHARTS_DIR", "/app/runtime/results/charts"))
+CHART_NAME_PATTERN = re.compile(r"[A-Za-z0-9_\-]+")
+GZIP_MIN_BYTES = 512
+COMPRESSIBLE_MIMETYPES = {"text/html", "text/plain", "text/css", "application/json", "application/javascript"}
+# Figure URLs carry a content hash (?v=), so a given URL never changes content
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+INDEX_TEMPLATE_PATH = Path(app.root_path) / "templates" / "index.html"
+# How long a served index snapshot is trusted before its input files are stat'ed again
+INDEX_SNAPSHOT_CHECK_SECONDS = float(get_env("INDEX_SNAPSHOT_CHECK_SECONDS", "1.0"))
+ROWS_DEFAULT_LIMIT = 50
+ROWS_MAX_LIMIT = 500
+ROWS_COUNT_CAP = 10_000
+# Keyset order for /api/rows (column -> value types allowed in the cursor); rowid breaks ties so the order
+# is total. Keys may be NULL, and Year may be stored as REAL.
+ROWS_KEY_COLUMNS = {"Country": (str, type(None)), "Year": (int, float, type(None))}
+EXPORT_BATCH_SIZE = int(get_env("EXPORT_BATCH_SIZE", "1000"))
+
+# Read-only connections shared by all endpoints of this worker process
+DB_POOL = ReadOnlyPool(SQLITE_PATH, size=int(get_env("SQLITE_POOL_SIZE", "4")), observer=metrics.observe_query)
+
+# Reports, preview and figure listings are reloaded only when the underlying files change
+ARTIFACTS = ArtifactCache(observer=metrics.observe_cache)
+
+
+def _state_metrics():
+    # Evaluated on each scrape: only cached listings and single stat() calls
+    yield "web_app_up", "Application is up and running", {}, 1
+    yield "web_app_info", "Application information", {"version": "1.0.0", "service": "web"}, 1
+    yield "web_database_available", "Database file exists", {}, int(SQLITE_PATH.exists())
+    # Not counted as a cache lookup: otherwise every scrape would add a hit to the hit-ratio panel
+    yield "web_figures_count", "Number of generated figures", {}, len(_list_figures(count=False))
+    for report, path in (
+        ("load_summary", LOAD_SUMMARY_PATH),
+        ("quality_report", QUALITY_REPORT_PATH),
+        ("research_report", RESEARCH_REPORT_PATH),
+    ):
+        yield "web_reports_available", "Reports availability", {"report": report}, int(path.exists())
+
+
+# Registered before compress_response, so request metrics see the final (compressed) response
+metrics.init_app(app, _state_metrics)
 
 
 def _load_json(path: Path) -> dict:
@@ -30,25 +100,318 @@ def _read_preview(limit: int = 20) -> dict:
     if not SQLITE_PATH.exists():
         return {"columns": [], "rows": []}
 
-    query = f'SELECT * FROM "{DB_TABLE}" LIMIT {limit}'
-    with sqlite3.connect(SQLITE_PATH) as conn:
-        preview_df = pd.read_sql_query(query, conn)
-
+    columns, rows = DB_POOL.query(f"SELECT * FROM {quote_identifier(DB_TABLE)} LIMIT ?", (limit,), name="preview")
     return {
-        "columns": preview_df.columns.tolist(),
-        "rows": preview_df.to_dict(orient="records"),
+        "columns": columns,
+        "rows": rows_to_records(columns, rows),
+    }
+
+
+def _cached_json(key: str, path: Path) -> dict:
+    return ARTIFACTS.get(key, path, lambda: _load_json(path), default={})
+
+
+def _cached_preview() -> dict:
+    # Rollback-journal writes change the main file; WAL writes change the -wal file
+    wal_path = SQLITE_PATH.with_name(SQLITE_PATH.name + "-wal")
+    return ARTIFACTS.get("preview", [SQLITE_PATH, wal_path], _read_preview, default={"columns": [], "rows": []})
+
+
+def _list_figures(count: bool = True) -> list[str]:
+    # The directory mtime changes whenever a figure is added, removed or renamed
+    return ARTIFACTS.get(
+        "figures",
+        FIGURES_DIR,
+        lambda: sorted([p.name for p in FIGURES_DIR.glob("*.png")]),
+        default=[],
+        count=count,
+    )
+
+
+def _list_figure_renditions() -> list[dict]:
+    return ARTIFACTS.get(
+        "figure_renditions",
+        [FIGURES_DIR, FIGURES_MANIFEST_PATH],
+        _build_figure_renditions,
+        default=[],
+    )
+
+
+def _build_figure_renditions() -> list[dict]:
+    # Figures without manifest entries (e.g. saved before renditions existed) fall back to the PNG
+    manifest = _load_json(FIGURES_MANIFEST_PATH).get("figures", {})
+    figures = []
+    for name in _list_figures():
+        renditions = manifest.get(name, {})
+        original = renditions.get("original", {"path": name})
+        figures.append(
+            {
+                "name": name,
+                "original": original,
+                "thumb": renditions.get("thumb", original),
+                "screen": renditions.get("screen", original),
+            }
+        )
+    return figures
+
+
+def _table_columns() -> list[str]:
+    return ARTIFACTS.get(
+        "table_columns",
+        SQLITE_PATH,
+        lambda: [
+            row[1] for row in DB_POOL.query(f"PRAGMA table_info({quote_identifier(DB_TABLE)})", name="table_info")[1]
+        ],
+        default=[],
+    )
+
+
+def _encode_cursor(values: list) -> str:
+    raw = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, types: list[tuple[type, ...]]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    # Each key must have one of its column's types (bool is an int subclass in Python, but not a valid key)
+    for value, kinds in zip(values, types):
+        if not isinstance(value, kinds) or isinstance(value, bool):
+            raise ValueError("Invalid cursor")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def _keyset_condition(key_exprs: list[str], after: list) -> tuple[str, list]:
+    """Condition selecting the rows ordered after ``after`` by ``key_exprs``.
+
+    Without NULL keys this is a row-value comparison that SQLite turns into an index range scan.
+    A NULL key compares as unknown there, so the cursor of a row with a NULL key uses the expanded
+    form instead: equal prefix (IS) and a greater next key, where NULL sorts first as in ORDER BY.
+    """
+    if all(value is not None for value in after):
+        return f"({', '.join(key_exprs)}) > ({', '.join('?' for _ in after)})", list(after)
+
+    alternatives, params = [], []
+    for i, (expr, value) in enumerate(zip(key_exprs, after)):
+        terms = [f"{prev} IS ?" for prev in key_exprs[:i]]
+        terms.append(f"{expr} IS NOT NULL" if value is None else f"{expr} > ?")
+        alternatives.append(f"({' AND '.join(terms)})")
+        params.extend(after[:i])
+        if value is not None:
+            params.append(value)
+    return f"({' OR '.join(alternatives)})", params
+
+
+def _int_arg(name: str, default: int | None = None) -> int | None:
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Parameter '{name}' must be an integer") from None
+
+
+def _requested_columns(table_columns: list[str]) -> list[str]:
+    requested = [c.strip() for c in request.args.get("columns", "").split(",") if c.strip()]
+    unknown = [col for col in requested if col not in table_columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return requested or table_columns
+
+
+def _rows_filters(table_columns: list[str]) -> tuple[list[str], list]:
+    conditions, params = [], []
+
+    countries = [
+        name.strip() for value in request.args.getlist("country") for name in value.split(",") if name.strip()
+    ]
+    if countries and "Country" in table_columns:
+        conditions.append(f'"Country" IN ({", ".join("?" for _ in countries)})')
+        params.extend(countries)
+
+    status = request.args.get("status")
+    if status and "Status" in table_columns:
+        conditions.append('"Status" = ?')
+        params.append(status)
+
+    year_from, year_to = _int_arg("year_from"), _int_arg("year_to")
+    if "Year" in table_columns:
+        if year_from is not None:
+            conditions.append('"Year" >= ?')
+            params.append(year_from)
+        if year_to is not None:
+            conditions.append('"Year" <= ?')
+            params.append(year_to)
+    return conditions, params
+
+
+def _count_rows(conditions: list[str], params: list) -> dict:
+    table = quote_identifier(DB_TABLE)
+    if not conditions:
+        # Row count recorded by ANALYZE at load time: no table scan
+        try:
+            _, stats = DB_POOL.query(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (DB_TABLE,), name="rows_estimate"
+            )
+        except Exception:
+            stats = []
+        if stats:
+            return {"value": int(str(stats[0][0]).split()[0]), "exact": False}
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    _, result = DB_POOL.query(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {table}{where} LIMIT ?)",
+        (*params, ROWS_COUNT_CAP + 1),
+        name="rows_count",
+    )
+    count = result[0][0]
+    return {"value": min(count, ROWS_COUNT_CAP), "exact": count <= ROWS_COUNT_CAP}
+
+
+@app.route("/api/rows")
+def api_rows():
+    table_columns = _table_columns()
+    if not table_columns:
+        return jsonify({"error": "Data is not loaded yet"}), 503
+
+    key_columns = [col for col in ROWS_KEY_COLUMNS if col in table_columns]
+    key_exprs = [quote_identifier(col) for col in key_columns] + ["rowid"]
+    key_expr = ", ".join(key_exprs)
+
+    try:
+        columns = _requested_columns(table_columns)
+        limit = min(max(_int_arg("limit", ROWS_DEFAULT_LIMIT), 1), ROWS_MAX_LIMIT)
+        conditions, params = _rows_filters(table_columns)
+        cursor = request.args.get("after")
+        after = _decode_cursor(cursor, [ROWS_KEY_COLUMNS[col] for col in key_columns] + [(int,)]) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    page_conditions, page_params = list(conditions), list(params)
+    if after is not None:
+        condition, condition_params = _keyset_condition(key_exprs, after)
+        page_conditions.append(condition)
+        page_params.extend(condition_params)
+
+    select_list = ", ".join([quote_identifier(col) for col in columns] + [key_expr])
+    where = f" WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+    sql = f"SELECT {select_list} FROM {quote_identifier(DB_TABLE)}{where} ORDER BY {key_expr} LIMIT ?"
+    _, rows = DB_POOL.query(sql, (*page_params, limit + 1), name="rows_page")
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    width = len(columns)
+    payload = {
+        "columns": columns,
+        "rows": rows_to_records(columns, [row[:width] for row in rows]),
+        "limit": limit,
+        "next_cursor": _encode_cursor(list(rows[-1][width:])) if has_more else None,
     }
+    # The total is only needed to render the first page of a listing
+    if after is None:
+        payload["count"] = _count_rows(conditions, params)
+    return jsonify(payload)
+
 
+def _ndjson_batches(columns: list[str], rows_batches):
+    for rows in rows_batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(",", ":")) + "\n" for row in rows
+        )
 
-def _list_figures() -> list[str]:
-    if not FIGURES_DIR.exists():
-        return []
-    return sorted([p.name for p in FIGURES_DIR.glob("*.png")])
 
+def _csv_batches(columns: list[str], rows_batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in rows_batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
 
-# Global counters for metrics
-_request_count = 0
-_last_request_time = None
+
+def _stream_rows(sql: str, params: list):
+    # The pooled connection is held only while the response is being streamed
+    with DB_POOL.connection() as conn:
+        # Only time spent inside SQLite is measured, not the time the client takes to read a batch
+        elapsed = 0.0
+        start = time.perf_counter()
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    return
+                yield rows
+                start = time.perf_counter()
+        finally:
+            cursor.close()
+            DB_POOL.observe("export", elapsed)
+
+
+def _encode_stream(chunks, use_gzip: bool):
+    if not use_gzip:
+        for chunk in chunks:
+            yield chunk.encode("utf-8")
+        return
+
+    # Level 1: on-the-fly compression must keep up with the cursor; wbits=31 writes a gzip container
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.route("/api/export")
+def api_export():
+    table_columns = _table_columns()
+    if not table_columns:
+        return jsonify({"error": "Data is not loaded yet"}), 503
+
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in {"ndjson", "csv"}:
+        return jsonify({"error": "Parameter 'format' must be 'ndjson' or 'csv'"}), 400
+
+    try:
+        columns = _requested_columns(table_columns)
+        conditions, params = _rows_filters(table_columns)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    key_columns = [quote_identifier(col) for col in ROWS_KEY_COLUMNS if col in table_columns]
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = (
+        f"SELECT {', '.join(quote_identifier(col) for col in columns)} FROM {quote_identifier(DB_TABLE)}"
+        f"{where} ORDER BY {', '.join(key_columns + ['rowid'])}"
+    )
+
+    batches = _stream_rows(sql, params)
+    chunks = _csv_batches(columns, batches) if export_format == "csv" else _ndjson_batches(columns, batches)
+    use_gzip = "gzip" in request.accept_encodings
+
+    mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    response = Response(_encode_stream(chunks, use_gzip), mimetype=mimetype)
+    # Closing the row generator runs its finally and releases the pooled connection as soon as the
+    # response ends, including a client disconnect mid-stream, instead of whenever it is collected
+    response.call_on_close(batches.close)
+    response.headers["Content-Disposition"] = f'attachment; filename="{DB_TABLE}.{export_format}"'
+    response.headers["Vary"] = "Accept-Encoding"
+    if use_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
 
 
 @app.route("/health")
@@ -56,63 +419,226 @@ def health() -> tuple[dict, int]:
     return {"status": "ok"}, 200
 
 
-@app.route("/metrics")
-def metrics():
-    """Prometheus metrics endpoint."""
-    import time
-    import os
-    
-    # Basic application metrics in Prometheus format
-    lines = [
-        "# HELP web_app_up Application is up and running",
-        "# TYPE web_app_up gauge",
-        "web_app_up 1",
-        "",
-        "# HELP web_app_info Application information",
-        "# TYPE web_app_info gauge",
-        'web_app_info{version="1.0.0",service="web"} 1',
-        "",
-        "# HELP web_database_available Database file exists",
-        "# TYPE web_database_available gauge",
-        f"web_database_available {1 if SQLITE_PATH.exists() else 0}",
-        "",
-        "# HELP web_figures_count Number of generated figures",
-        "# TYPE web_figures_count gauge",
-        f"web_figures_count {len(_list_figures())}",
-        "",
-        "# HELP web_reports_available Reports availability",
-        "# TYPE web_reports_available gauge",
-        f'web_reports_available{{report="load_summary"}} {1 if LOAD_SUMMARY_PATH.exists() else 0}',
-        f'web_reports_available{{report="quality_report"}} {1 if QUALITY_REPORT_PATH.exists() else 0}',
-        f'web_reports_available{{report="research_report"}} {1 if RESEARCH_REPORT_PATH.exists() else 0}',
-        "",
-    ]
-    
-    from flask import Response
-    return Response("\n".join(lines), mimetype="text/plain")
+def _asset_version(path: Path) -> str | None:
+    return ARTIFACTS.get(
+        f"asset:{path}",
+        path,
+        lambda: hashlib.sha1(path.read_bytes()).hexdigest()[:16],
+        label="asset_versions",
+    )
+
+
+@app.template_global()
+def figure_url(path: str) -> str:
+    version = _asset_version(FIGURES_DIR / path)
+    return url_for("get_figure", filename=path, v=version) if version else url_for("get_figure", filename=path)
 
 
 @app.route("/figures/<path:filename>")
 def get_figure(filename: str):
-    return send_from_directory(FIGURES_DIR, filename)
+    full_path = safe_join(str(FIGURES_DIR), filename)
+    if full_path is None or not Path(full_path).is_file():
+        abort(404)
+
+    version = _asset_version(Path(full_path))
+    immutable = version is not None and request.args.get("v") == version
+    response = send_from_directory(
+        FIGURES_DIR, filename, etag=version or True, max_age=IMMUTABLE_MAX_AGE if immutable else None
+    )
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+@app.route("/api/charts")
+def list_charts():
+    if not CHARTS_DIR.exists():
+        return jsonify({"charts": []})
+    return jsonify({"charts": sorted(p.stem for p in CHARTS_DIR.glob("*.json"))})
+
+
+@app.route("/api/charts/<name>")
+def get_chart(name: str):
+    if not CHART_NAME_PATTERN.fullmatch(name):
+        abort(404)
+    path = CHARTS_DIR / f"{name}.json"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        abort(404)
+
+    # Same encoding choice as compress_response; each encoding is a separate representation with its own ETag
+    negotiated = _negotiated_encoding() if stat.st_size >= GZIP_MIN_BYTES else None
+    encoding, suffix = negotiated or ("identity", "")
+    etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}{suffix}"
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = ARTIFACTS.get(
+            f"chart:{name}:{encoding}",
+            path,
+            lambda: _encode_body(path.read_bytes(), encoding),
+            label="charts",
+        )
+        if body is None:
+            abort(404)
+        response = Response(body, mimetype="application/json")
+        if negotiated is not None:
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _index_fingerprint() -> tuple[str, datetime | None]:
+    # Everything the page is rendered from; any change yields a new ETag
+    paths = [
+        INDEX_TEMPLATE_PATH,
+        LOAD_SUMMARY_PATH,
+        QUALITY_REPORT_PATH,
+        RESEARCH_REPORT_PATH,
+        SQLITE_PATH,
+        SQLITE_PATH.with_name(SQLITE_PATH.name + "-wal"),
+        FIGURES_DIR,
+        FIGURES_MANIFEST_PATH,
+        *(FIGURES_DIR / name for name in _list_figures()),
+    ]
+    signature = file_signature(paths)
+    etag = hashlib.sha1(repr((str(SQLITE_PATH), DB_TABLE, signature)).encode("utf-8")).hexdigest()[:20]
+    mtimes = [part[0] for part in signature or () if part is not None]
+    last_modified = datetime.fromtimestamp(max(mtimes) // 10**9, tz=timezone.utc) if mtimes else None
+    return etag, last_modified
+
+
+def _not_modified(etag: str, last_modified: datetime | None) -> bool:
+    # Compressed responses carry the encoding as an ETag suffix (see compress_response)
+    if request.if_none_match:
+        return any(request.if_none_match.contains(etag + suffix) for suffix in ("", "-gz", "-br"))
+    if last_modified is not None and request.if_modified_since is not None:
+        return request.if_modified_since >= last_modified
+    return False
+
+
+def _with_validators(response: Response, etag: str, last_modified: datetime | None) -> Response:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def _negotiated_encoding() -> tuple[str, str] | None:
+    if brotli is not None and "br" in request.accept_encodings:
+        return "br", "-br"
+    if "gzip" in request.accept_encodings:
+        return "gzip", "-gz"
+    return None
+
+
+def _encode_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+@app.after_request
+def compress_response(response: Response) -> Response:
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+
+    negotiated = _negotiated_encoding()
+    if negotiated is None:
+        return response
+    encoding, suffix = negotiated
+    response.set_data(_encode_body(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + suffix, weak=weak)
+    return response
+
+
+_index_snapshot: dict | None = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def _render_index_snapshot(etag: str, last_modified: datetime | None) -> dict:
+    html = render_template(
+        "index.html",
+        preview=_cached_preview(),
+        load_summary=_cached_json("load_summary", LOAD_SUMMARY_PATH),
+        quality_report=_cached_json("quality_report", QUALITY_REPORT_PATH),
+        research_report=_cached_json("research_report", RESEARCH_REPORT_PATH),
+        figures=_list_figure_renditions(),
+    ).encode("utf-8")
+
+    # Compressed once per artifact version, so the slowest (smallest) settings are affordable
+    bodies = {"identity": html, "gzip": gzip.compress(html, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(html, quality=11)
+    return {"etag": etag, "last_modified": last_modified, "bodies": bodies}
+
+
+def _current_index_snapshot() -> dict:
+    global _index_snapshot, _index_checked_at
+
+    snapshot = _index_snapshot
+    if snapshot is not None and time.monotonic() - _index_checked_at < INDEX_SNAPSHOT_CHECK_SECONDS:
+        ARTIFACTS.record("index_snapshot", "hit")
+        return snapshot
+
+    with _index_lock:
+        # Concurrent requests wait for a single rebuild instead of each rendering the page
+        if _index_snapshot is not None and _index_snapshot is not snapshot:
+            ARTIFACTS.record("index_snapshot", "hit")
+            return _index_snapshot
+
+        etag, last_modified = _index_fingerprint()
+        if _index_snapshot is None or _index_snapshot["etag"] != etag:
+            _index_snapshot = _render_index_snapshot(etag, last_modified)
+            ARTIFACTS.record("index_snapshot", "miss")
+        else:
+            ARTIFACTS.record("index_snapshot", "hit")
+        _index_checked_at = time.monotonic()
+        return _index_snapshot
 
 
 @app.route("/")
 def index():
-    preview = _read_preview()
-    load_summary = _load_json(LOAD_SUMMARY_PATH)
-    quality_report = _load_json(QUALITY_REPORT_PATH)
-    research_report = _load_json(RESEARCH_REPORT_PATH)
-    figures = _list_figures()
+    snapshot = _current_index_snapshot()
+    etag, last_modified = snapshot["etag"], snapshot["last_modified"]
 
-    return render_template(
-        "index.html",
-        preview=preview,
-        load_summary=load_summary,
-        quality_report=quality_report,
-        research_report=research_report,
-        figures=figures,
-    )
+    negotiated = _negotiated_encoding()
+    encoding, suffix = negotiated if negotiated and negotiated[0] in snapshot["bodies"] else ("identity", "")
+    if _not_modified(etag, last_modified):
+        # A 304 carries the ETag of the representation the client would have received
+        return _with_validators(Response(status=304), etag + suffix, last_modified)
+
+    response = Response(snapshot["bodies"][encoding], mimetype="text/html")
+    if encoding != "identity":
+        response.headers["Content-Encoding"] = encoding
+    return _with_validators(response, etag + suffix, last_modified)
 
 
 if __name__ == "__main__":
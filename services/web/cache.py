@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+Signature = tuple
+
+
+def file_signature(paths: Iterable[Path]) -> Signature | None:
+    # mtime_ns + size + inode: an atomic replace changes the inode even within one mtime tick
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            parts.append(None)
+            continue
+        parts.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return None if all(part is None for part in parts) else tuple(parts)
+
+
+class ArtifactCache:
+    """In-process cache of values derived from files, invalidated by mtime/size/inode.
+
+    Each key is loaded at most once per file version: concurrent misses for the same
+    key wait on a per-key lock and reuse the first loader's result. If a reload fails
+    (e.g. a report is caught mid-write), the previous value is served until the next change.
+    Every lookup result is also passed to ``observer(label, result)`` for metrics export,
+    except lookups made with ``count=False`` (e.g. by the metrics collector itself).
+    """
+
+    def __init__(self, observer: Callable[[str, str], None] | None = None) -> None:
+        self.observer = observer
+        self._entries: dict[str, tuple[Signature | None, Any]] = {}
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+
+    def record(self, label: str, result: str) -> None:
+        {"hit": self.hits, "miss": self.misses, "error": self.errors}[result][label] += 1
+        if self.observer is not None:
+            self.observer(label, result)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(
+        self,
+        key: str,
+        paths: Path | Iterable[Path],
+        loader: Callable[[], Any],
+        default: Any = None,
+        label: str | None = None,
+        count: bool = True,
+    ) -> Any:
+        paths = [paths] if isinstance(paths, Path) else list(paths)
+        label = label or key
+        record = self.record if count else lambda label, result: None
+
+        signature = file_signature(paths)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == signature:
+            record(label, "hit")
+            return entry[1]
+
+        with self._key_lock(key):
+            # Another request may have reloaded this key while we were waiting
+            signature = file_signature(paths)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                record(label, "hit")
+                return entry[1]
+
+            record(label, "miss")
+            if signature is None:
+                value = default
+            else:
+                try:
+                    value = loader()
+                except Exception:
+                    record(label, "error")
+                    if entry is None:
+                        raise
+                    return entry[1]
+
+            self._entries[key] = (signature, value)
+            return value
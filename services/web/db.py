@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+
+class ReadOnlyPool:
+    """Per-process pool of read-only SQLite connections for web endpoints.
+
+    Connections are opened with the URI ``mode=ro`` and keep a prepared statement
+    cache, so repeated queries skip parsing. If the database file is replaced
+    (different inode), pooled connections are dropped and reopened on next use.
+    Query durations are reported to ``observer(name, seconds)`` when one is set.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        size: int = 4,
+        cached_statements: int = 64,
+        observer: Callable[[str, float], None] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.size = size
+        self.cached_statements = cached_statements
+        self.observer = observer
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._file_id: tuple[int, int] | None = None
+
+    def _current_file_id(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_dev, stat.st_ino
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = f"{self.path.resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        file_id = self._current_file_id()  # raises FileNotFoundError when the DB is missing
+        with self._lock:
+            # Connections must not cross a fork (e.g. gunicorn workers), and must not outlive the file
+            if self._pid != os.getpid():
+                self._reset()
+            if self._file_id != file_id:
+                self._drain()
+                self._file_id = file_id
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        # Only a connection whose user finished cleanly goes back; on any exception (including
+        # GeneratorExit from an aborted streamed response) it may hold an open statement, so close it
+        returned = False
+        try:
+            yield conn
+            if self._file_id == file_id and self._idle.qsize() < self.size:
+                self._idle.put(conn)
+                returned = True
+        finally:
+            if not returned:
+                conn.close()
+
+    def observe(self, name: str, seconds: float) -> None:
+        if self.observer is not None:
+            self.observer(name, seconds)
+
+    def query(self, sql: str, params: Sequence[Any] = (), name: str = "query") -> tuple[list[str], list[tuple]]:
+        with self.connection() as conn:
+            start = time.perf_counter()
+            cursor = conn.execute(sql, params)
+            columns = [item[0] for item in cursor.description or ()]
+            rows = cursor.fetchall()
+            self.observe(name, time.perf_counter() - start)
+            return columns, rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._drain()
+
+
+def rows_to_records(columns: list[str], rows: list[tuple]) -> list[dict[str, Any]]:
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Iterable
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    disable_created_metrics,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# With several worker processes (e.g. gunicorn) each process writes its samples to mmap'ed files in
+# PROMETHEUS_MULTIPROC_DIR and a scrape aggregates them; the directory must be emptied before start
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+# *_created series double the scrape size and are not used by the dashboards
+disable_created_metrics()
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# (metric name, help, labels, value) of a gauge computed at scrape time
+StateSample = tuple[str, str, dict[str, str], float]
+
+REQUESTS = Counter(
+    "web_http_requests_total",
+    "HTTP requests by route, method and status",
+    ["route", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "web_http_request_duration_seconds",
+    "Time spent handling a request (until the response is returned to the server)",
+    ["route", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "web_http_response_size_bytes",
+    "Response body size as sent (after compression); streamed responses are not counted",
+    ["route"],
+    buckets=SIZE_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "web_http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "web_artifact_cache_requests_total",
+    "Artifact cache lookups by artifact and result (hit, miss, error)",
+    ["artifact", "result"],
+)
+SQLITE_LATENCY = Histogram(
+    "web_sqlite_query_duration_seconds",
+    "SQLite query duration by query name",
+    ["query"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def observe_cache(artifact: str, result: str) -> None:
+    CACHE_REQUESTS.labels(artifact=artifact, result=result).inc()
+
+
+def observe_query(query: str, seconds: float) -> None:
+    SQLITE_LATENCY.labels(query=query).observe(seconds)
+
+
+class _StateCollector:
+    # Gauges computed at scrape time from in-memory state or single stat() calls, never directory scans
+    def __init__(self, collect: Callable[[], Iterable[StateSample]]) -> None:
+        self._collect = collect
+
+    def collect(self):
+        families: dict[str, GaugeMetricFamily] = {}
+        for name, help_text, labels, value in self._collect():
+            family = families.get(name)
+            if family is None:
+                family = families[name] = GaugeMetricFamily(name, help_text, labels=list(labels))
+            family.add_metric(list(labels.values()), value)
+        return list(families.values())
+
+
+def _route_label() -> str:
+    # The URL rule (e.g. /api/charts/<name>) keeps label cardinality bounded
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def init_app(app: Flask, state: Callable[[], Iterable[StateSample]]) -> None:
+    """Register request instrumentation and the /metrics endpoint.
+
+    Must be called before other after_request hooks are registered: Flask runs them in
+    reverse order, so these hooks see the final (compressed) response.
+    """
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        from prometheus_client import REGISTRY as registry
+    state_registry = CollectorRegistry()
+    state_registry.register(_StateCollector(state))
+
+    @app.before_request
+    def _start_request() -> None:
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_flight = True
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request(response: Response) -> Response:
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        route = _route_label()
+        REQUEST_LATENCY.labels(route=route, method=request.method).observe(time.perf_counter() - start)
+        REQUESTS.labels(route=route, method=request.method, status=str(response.status_code)).inc()
+        if not response.is_streamed and response.content_length is not None:
+            RESPONSE_SIZE.labels(route=route).observe(response.content_length)
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc: BaseException | None) -> None:
+        if g.pop("metrics_in_flight", False):
+            IN_FLIGHT.dec()
+
+    @app.route("/metrics")
+    def metrics() -> Response:
+        """Prometheus metrics endpoint."""
+        body = generate_latest(registry) + generate_latest(state_registry)
+        return Response(body, content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,177 @@
+"""
+Модуль для кешування проміжних результатів аналізу
+Обчислює fingerprint даних та зберігає результати в пам'яті і на диску
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Кеш у пам'яті процесу: {ключ: значення}
+_MEMORY_CACHE: Dict[str, Any] = {}
+
+
+def dataframe_fingerprint(df: pd.DataFrame, columns: Optional[List[str]] = None) -> str:
+    """
+    Обчислює fingerprint вмісту DataFrame (назви, типи та значення стовпців)
+
+    Args:
+        df: DataFrame
+        columns: список стовпців (за замовчуванням усі)
+
+    Returns:
+        str: sha1-хеш вмісту
+    """
+    data = df if columns is None else df[columns]
+
+    digest = hashlib.sha1()
+    digest.update(json.dumps([str(col) for col in data.columns]).encode("utf-8"))
+    digest.update(json.dumps([str(dtype) for dtype in data.dtypes]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def params_fingerprint(*parts: Any) -> str:
+    """
+    Обчислює fingerprint набору параметрів (чисел, рядків, словників, масивів)
+
+    Args:
+        parts: довільні серіалізовні значення
+
+    Returns:
+        str: sha1-хеш параметрів
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_cache_dir() -> Optional[Path]:
+    """
+    Повертає папку дискового кешу (змінна середовища ANALYTICS_CACHE_DIR).
+    Якщо змінна не задана, кешування відбувається лише в пам'яті.
+    """
+    env_path = os.getenv("ANALYTICS_CACHE_DIR", "").strip()
+    if not env_path:
+        return None
+
+    cache_dir = Path(env_path)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def get_cache_max_bytes() -> int:
+    """
+    Максимальний розмір дискового кешу (ANALYTICS_CACHE_MAX_MB, 0 - без обмеження)
+    """
+    return int(float(os.getenv("ANALYTICS_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+
+def prune_disk_cache(cache_dir: Path, max_bytes: Optional[int] = None, keep: Optional[Path] = None) -> int:
+    """
+    Видаляє найстаріші (за часом зміни) файли дискового кешу, доки його розмір
+    не стане не більшим за max_bytes. Файл keep (щойно записаний) не видаляється.
+
+    Args:
+        cache_dir: папка дискового кешу
+        max_bytes: ліміт розміру в байтах (за замовчуванням ANALYTICS_CACHE_MAX_MB)
+        keep: файл, який потрібно зберегти
+
+    Returns:
+        int: кількість видалених файлів
+    """
+    max_bytes = get_cache_max_bytes() if max_bytes is None else max_bytes
+    if max_bytes <= 0:
+        return 0
+
+    entries = []
+    for path in cache_dir.glob("*.pkl"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def cached(key: str, compute: Callable[[], Any], persist: bool = True) -> Any:
+    """
+    Повертає значення з кешу або обчислює і зберігає його
+
+    Args:
+        key: ключ кешу (як правило, містить fingerprint даних)
+        compute: функція без аргументів, що обчислює значення
+        persist: чи зберігати значення у дисковий кеш
+
+    Returns:
+        Закешоване або щойно обчислене значення
+    """
+    if key in _MEMORY_CACHE:
+        return _MEMORY_CACHE[key]
+
+    cache_dir = get_cache_dir() if persist else None
+    cache_file = cache_dir / f"{key}.pkl" if cache_dir is not None else None
+
+    if cache_file is not None and cache_file.exists():
+        try:
+            with cache_file.open("rb") as f:
+                value = pickle.load(f)
+            # Час зміни - час останнього використання: прибирання видаляє давно не потрібні записи
+            try:
+                os.utime(cache_file)
+            except OSError:
+                pass
+            _MEMORY_CACHE[key] = value
+            return value
+        except Exception as e:
+            print(f"Попередження: не вдалося прочитати кеш {cache_file}: {e}")
+
+    value = compute()
+    _MEMORY_CACHE[key] = value
+
+    if cache_file is not None:
+        # Пишемо у тимчасовий файл, щоб паралельні процеси не прочитали частковий запис.
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with tmp_file.open("wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            tmp_file.unlink(missing_ok=True)
+            print(f"Попередження: не вдалося записати кеш {cache_file}: {e}")
+        else:
+            prune_disk_cache(cache_dir, keep=cache_file)
+
+    return value
+
+
+def clear_memory_cache() -> None:
+    """
+    Очищає кеш у пам'яті процесу
+    """
+    _MEMORY_CACHE.clear()
@@ -0,0 +1,482 @@
+"""
+Модуль для агрегування даних графіків
+Бінінг, вибірки та підсумкова статистика на NumPy (без matplotlib),
+експорт даних графіків у компактний JSON для веб-інтерфейсу
+"""
+
+import json
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from src.correlation import get_correlation_matrix
+except ImportError:  # запуск як скрипта або з notebooks (src у sys.path)
+    from correlation import get_correlation_matrix
+
+
+def reservoir_sample_indices(n: int, k: int, random_state: int = 42) -> np.ndarray:
+    """
+    Рівномірна вибірка k індексів з n резервуарним методом (Algorithm L).
+    Кількість кроків O(k·(1 + log(n/k))), тобто не залежить лінійно від n.
+
+    Args:
+        n: кількість елементів
+        k: розмір вибірки
+        random_state: random seed
+
+    Returns:
+        np.ndarray з відсортованими індексами
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        return np.arange(n)
+
+    rng = np.random.default_rng(random_state)
+    reservoir = np.arange(k)
+    w = np.exp(np.log(rng.random()) / k)
+    i = k - 1
+
+    while True:
+        i += int(np.floor(np.log(rng.random()) / np.log1p(-w))) + 1
+        if i >= n:
+            break
+        reservoir[rng.integers(k)] = i
+        w *= np.exp(np.log(rng.random()) / k)
+
+    return np.sort(reservoir)
+
+
+def bin_xy(x: np.ndarray, y: np.ndarray, bins: int = 100,
+           value_range: Optional[Tuple[Tuple[float, float], Tuple[float, float]]] = None) -> Dict:
+    """
+    Двовимірна гістограма точок (x, y)
+
+    Args:
+        x, y: координати точок
+        bins: кількість бінів по кожній осі
+        value_range: межі ((xmin, xmax), (ymin, ymax))
+
+    Returns:
+        Словник: counts (bins × bins, перший індекс - x), x_edges, y_edges
+    """
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=value_range)
+    return {'counts': counts, 'x_edges': x_edges, 'y_edges': y_edges}
+
+
+def binned_trend(x: np.ndarray, y: np.ndarray, bins: int = 50, degree: int = 1) -> Dict:
+    """
+    Лінія тренду за середніми значеннями в бінах по x.
+    Поліном підганяється до середніх з вагами за кількістю точок у біні,
+    тому вартість підгонки не залежить від кількості точок.
+
+    Args:
+        x, y: координати точок
+        bins: кількість бінів по x
+        degree: степінь полінома
+
+    Returns:
+        Словник: x_mean, y_mean, counts, coefficients
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    x_min, x_max = x.min(), x.max()
+    if x_max == x_min:
+        x_max = x_min + 1.0
+    idx = np.minimum(((x - x_min) / (x_max - x_min) * bins).astype(np.int64), bins - 1)
+
+    counts = np.bincount(idx, minlength=bins)
+    valid = counts > 0
+    x_mean = np.bincount(idx, weights=x, minlength=bins)[valid] / counts[valid]
+    y_mean = np.bincount(idx, weights=y, minlength=bins)[valid] / counts[valid]
+
+    if valid.sum() > degree:
+        coefficients = np.polyfit(x_mean, y_mean, degree, w=np.sqrt(counts[valid]))
+    else:
+        coefficients = np.polyfit(x, y, degree)
+
+    return {
+        'x_mean': x_mean,
+        'y_mean': y_mean,
+        'counts': counts[valid],
+        'coefficients': coefficients,
+    }
+
+
+def binned_kde(values: np.ndarray, grid_size: int = 1024,
+               bandwidth: Optional[float] = None, extend: float = 0.5) -> Dict:
+    """
+    Оцінка густини ядром Гауса через лінійний бінінг і згортку FFT.
+    Вартість O(n + grid·log(grid)) замість O(n·grid) для прямого обчислення.
+    Ширина вікна за замовчуванням - правило Скотта (як у scipy/pandas).
+
+    Args:
+        values: значення без пропусків
+        grid_size: кількість точок сітки
+        bandwidth: ширина ядра (стандартне відхилення)
+        extend: розширення сітки за межі даних (частка розмаху)
+
+    Returns:
+        Словник: x (сітка), density, bandwidth
+    """
+    x = np.asarray(values, dtype=float)
+    x = x[np.isfinite(x)]
+    n = len(x)
+    if n == 0:
+        return {'x': np.empty(0), 'density': np.empty(0), 'bandwidth': None}
+
+    if bandwidth is None:
+        std = x.std(ddof=1) if n > 1 else 0.0
+        bandwidth = std * n ** (-1 / 5)
+    if not bandwidth > 0:
+        bandwidth = max(abs(x[0]), 1.0) * 1e-3
+
+    lo, hi = x.min(), x.max()
+    span = max(hi - lo, 6 * bandwidth)
+    lo, hi = lo - extend * span, hi + extend * span
+    grid = np.linspace(lo, hi, grid_size)
+    delta = grid[1] - grid[0]
+
+    # Лінійний бінінг: кожна точка ділить вагу між двома сусідніми вузлами
+    pos = (x - lo) / delta
+    left = np.clip(np.floor(pos).astype(np.int64), 0, grid_size - 2)
+    frac = pos - left
+    weights = np.bincount(left, weights=1 - frac, minlength=grid_size) \
+        + np.bincount(left + 1, weights=frac, minlength=grid_size)
+
+    half = min(int(np.ceil(5 * bandwidth / delta)), grid_size - 1)
+    offsets = np.arange(-half, half + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+
+    size = grid_size + len(kernel) - 1
+    nfft = 1 << (size - 1).bit_length()
+    conv = np.fft.irfft(np.fft.rfft(weights, nfft) * np.fft.rfft(kernel, nfft), nfft)
+    density = np.maximum(conv[half:half + grid_size], 0.0) / n
+
+    return {'x': grid, 'density': density, 'bandwidth': float(bandwidth)}
+
+
+def compute_distribution_summary(values: np.ndarray, bins: int = 30,
+                                 kde_grid: int = 1024, max_fliers: int = 1000) -> Dict:
+    """
+    Підсумок розподілу для всіх панелей графіка (гістограма, box plot, KDE)
+    за один прохід по даних. Результат JSON-сумісний (списки та числа).
+
+    Args:
+        values: значення (пропуски та inf ігноруються)
+        bins: кількість бінів гістограми
+        kde_grid: кількість точок сітки KDE
+        max_fliers: максимум викидів у підсумку (решта - рівномірна вибірка)
+
+    Returns:
+        Словник: count, mean, median, std, histogram, box, kde
+    """
+    x = np.asarray(values, dtype=float)
+    x = x[np.isfinite(x)]
+    if len(x) == 0:
+        raise ValueError("No finite values to summarize")
+
+    counts, edges = np.histogram(x, bins=bins)
+    q1, median, q3 = np.percentile(x, [25, 50, 75])
+    std = x.std(ddof=1) if len(x) > 1 else 0.0
+    return _summary_dict(x, counts, edges, (q1, median, q3), x.mean(), std, kde_grid, max_fliers)
+
+
+def _summary_dict(x: np.ndarray, counts: np.ndarray, edges: np.ndarray,
+                  quartiles: Tuple[float, float, float], mean: float, std: float,
+                  kde_grid: int, max_fliers: int) -> Dict:
+    """
+    Збирає підсумок розподілу з уже обчислених гістограми, квартилів і моментів
+    """
+    q1, median, q3 = quartiles
+
+    # Вуса за правилом 1.5·IQR (як у matplotlib.boxplot)
+    iqr = q3 - q1
+    inside = x[(x >= q1 - 1.5 * iqr) & (x <= q3 + 1.5 * iqr)]
+    whislo = inside.min() if len(inside) else q1
+    whishi = inside.max() if len(inside) else q3
+    fliers = x[(x < whislo) | (x > whishi)]
+    fliers_count = len(fliers)
+    if fliers_count > max_fliers:
+        fliers = fliers[reservoir_sample_indices(fliers_count, max_fliers)]
+
+    kde = binned_kde(x, grid_size=kde_grid)
+
+    return {
+        'count': int(len(x)),
+        'mean': float(mean),
+        'median': float(median),
+        'std': float(std),
+        'histogram': {
+            'counts': np.asarray(counts).astype(int).tolist(),
+            'edges': np.asarray(edges).tolist(),
+        },
+        'box': {
+            'q1': float(q1),
+            'med': float(median),
+            'q3': float(q3),
+            'whislo': float(whislo),
+            'whishi': float(whishi),
+            'fliers': fliers.tolist(),
+            'fliers_count': int(fliers_count),
+        },
+        'kde': {
+            'x': kde['x'].tolist(),
+            'density': kde['density'].tolist(),
+            'bandwidth': kde['bandwidth'],
+        },
+    }
+
+
+def compute_distribution_summaries(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                                   bins: int = 30, kde_grid: int = 512,
+                                   max_fliers: int = 1000) -> Dict[str, Dict]:
+    """
+    Підсумки розподілу для багатьох стовпців: одна копія даних у float-матрицю,
+    квартилі, моменти та гістограми всіх стовпців обчислюються разом.
+
+    Args:
+        df: DataFrame
+        columns: список стовпців (за замовчуванням усі числові)
+        bins: кількість бінів гістограми
+        kde_grid: кількість точок сітки KDE
+        max_fliers: максимум викидів у підсумку кожного стовпця
+
+    Returns:
+        Словник: стовпець -> підсумок як у compute_distribution_summary
+        (стовпці без жодного значення пропускаються)
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    values = df[columns].to_numpy(dtype=float, copy=True)
+    values[~np.isfinite(values)] = np.nan
+    valid = ~np.isnan(values)
+    n_valid = valid.sum(axis=0)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        quartiles = np.nanpercentile(values, [25, 50, 75], axis=0)
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+        lows = np.nanmin(values, axis=0)
+        highs = np.nanmax(values, axis=0)
+
+    # Межі як у np.histogram: для сталого стовпця діапазон розширюється на ±0.5
+    constant = lows == highs
+    lows = np.where(constant, lows - 0.5, lows)
+    highs = np.where(constant, highs + 0.5, highs)
+    edges = lows + (highs - lows) * np.linspace(0, 1, bins + 1)[:, None]
+
+    # Гістограми всіх стовпців одним bincount: номер біна зсувається на bins·номер стовпця
+    rows, cols = np.nonzero(valid)
+    position = (values[rows, cols] - lows[cols]) / (highs[cols] - lows[cols]) * bins
+    bin_idx = np.clip(position.astype(np.int64), 0, bins - 1)
+    counts = np.bincount(cols * bins + bin_idx, minlength=len(columns) * bins).reshape(len(columns), bins)
+
+    summaries = {}
+    for j, column in enumerate(columns):
+        if n_valid[j] == 0:
+            continue
+        x = values[valid[:, j], j]
+        std = stds[j] if n_valid[j] > 1 else 0.0
+        summaries[column] = _summary_dict(x, counts[j], edges[:, j], tuple(quartiles[:, j]),
+                                          means[j], std, kde_grid, max_fliers)
+    return summaries
+
+
+def _finite_list(values: np.ndarray, decimals: int = 6) -> list:
+    """
+    Масив у список для JSON: округлення, NaN/inf замінюються на None
+    """
+    values = np.round(np.asarray(values, dtype=float), decimals)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+def missing_values_chart(df: pd.DataFrame) -> Dict:
+    """
+    Дані графіка пропущених значень (як у plot_missing_values)
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        Словник: type, rows, columns, missing_count, missing_pct
+    """
+    missing = df.isnull().sum()
+    missing = missing[missing > 0].sort_values(ascending=True)
+    return {
+        'type': 'missing_values',
+        'rows': int(len(df)),
+        'columns': missing.index.tolist(),
+        'missing_count': missing.astype(int).tolist(),
+        'missing_pct': (missing / max(len(df), 1) * 100).round(2).tolist(),
+    }
+
+
+def distribution_chart(df: pd.DataFrame, column: str, bins: int = 30) -> Dict:
+    """
+    Дані графіка розподілу (гістограма, box plot, KDE) для одного стовпця
+
+    Args:
+        df: DataFrame
+        column: назва стовпця
+        bins: кількість бінів гістограми
+
+    Returns:
+        Словник: type, column та поля compute_distribution_summary
+    """
+    if column not in df.columns:
+        raise ValueError(f"Column '{column}' not found")
+    summary = compute_distribution_summary(df[column].dropna().to_numpy(), bins=bins)
+    return {'type': 'distribution', 'column': column, **_compact_summary(summary)}
+
+
+def distributions_chart(df: pd.DataFrame, columns: Optional[List[str]] = None, bins: int = 30) -> Dict:
+    """
+    Дані сітки розподілів (як у plot_distributions) для багатьох стовпців
+
+    Args:
+        df: DataFrame
+        columns: список стовпців (за замовчуванням усі числові)
+        bins: кількість бінів гістограм
+
+    Returns:
+        Словник: type, columns (стовпець -> підсумок розподілу)
+    """
+    summaries = compute_distribution_summaries(df, columns, bins=bins)
+    return {
+        'type': 'distributions',
+        'columns': {column: _compact_summary(summary) for column, summary in summaries.items()},
+    }
+
+
+def _compact_summary(summary: Dict) -> Dict:
+    # Крива KDE - найбільша частина підсумку, округлення суттєво зменшує JSON
+    summary['kde']['x'] = _finite_list(summary['kde']['x'])
+    summary['kde']['density'] = _finite_list(summary['kde']['density'], decimals=8)
+    return summary
+
+
+def correlation_chart(df: pd.DataFrame, method: str = 'pearson') -> Dict:
+    """
+    Дані теплової карти кореляцій
+
+    Args:
+        df: DataFrame
+        method: 'pearson' або 'spearman'
+
+    Returns:
+        Словник: type, method, columns, matrix (None для невизначених значень)
+    """
+    corr = get_correlation_matrix(df, method=method)
+    return {
+        'type': 'correlation_matrix',
+        'method': method,
+        'columns': corr.columns.tolist(),
+        'matrix': _finite_list(corr.to_numpy(), decimals=4),
+    }
+
+
+def grouped_comparison_chart(df: pd.DataFrame, group_col: str, value_col: str,
+                             top_n: int = 10) -> Dict:
+    """
+    Середні значення по групах (як у plot_grouped_comparison)
+
+    Args:
+        df: DataFrame
+        group_col: колонка для групування
+        value_col: колонка зі значеннями
+        top_n: кількість топ груп
+
+    Returns:
+        Словник: type, group_col, value_col, groups, means, counts
+    """
+    stats = df.groupby(group_col)[value_col].agg(['mean', 'count'])
+    stats = stats.sort_values('mean', ascending=False).head(top_n)
+    return {
+        'type': 'grouped_comparison',
+        'group_col': group_col,
+        'value_col': value_col,
+        'groups': [str(group) for group in stats.index],
+        'means': _finite_list(stats['mean'].to_numpy(), decimals=4),
+        'counts': stats['count'].astype(int).tolist(),
+    }
+
+
+def predictions_chart(y_true: np.ndarray, y_pred: np.ndarray, bins: int = 50) -> Dict:
+    """
+    Агреговані дані графіка фактичних vs передбачених значень і залишків
+
+    Args:
+        y_true: фактичні значення
+        y_pred: передбачені значення
+        bins: кількість бінів по кожній осі
+
+    Returns:
+        Словник: type, n, r2, rmse, actual_vs_predicted (2D-гістограма),
+        residuals (гістограма залишків)
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    residuals = y_true - y_pred
+
+    ss_res = float((residuals ** 2).sum())
+    ss_tot = float(((y_true - y_true.mean()) ** 2).sum()) if len(y_true) else 0.0
+    density = bin_xy(y_true, y_pred, bins=bins)
+    residual_counts, residual_edges = np.histogram(residuals, bins=bins)
+
+    return {
+        'type': 'model_predictions',
+        'n': int(len(y_true)),
+        'r2': 1 - ss_res / ss_tot if ss_tot > 0 else None,
+        'rmse': float(np.sqrt(ss_res / len(y_true))) if len(y_true) else None,
+        'actual_vs_predicted': {
+            'counts': density['counts'].astype(int).tolist(),
+            'x_edges': _finite_list(density['x_edges']),
+            'y_edges': _finite_list(density['y_edges']),
+        },
+        'residuals': {
+            'counts': residual_counts.tolist(),
+            'edges': _finite_list(residual_edges),
+        },
+    }
+
+
+def get_charts_path() -> Path:
+    """
+    Повертає шлях до папки з даними графіків (CHARTS_DIR або reports/charts)
+    """
+    env_path = os.getenv("CHARTS_DIR")
+    charts_dir = Path(env_path) if env_path else Path(__file__).parent.parent / "reports" / "charts"
+    charts_dir.mkdir(parents=True, exist_ok=True)
+    return charts_dir
+
+
+def write_chart_data(name: str, payload: Dict, charts_dir: Optional[Path] = None) -> Path:
+    """
+    Записує дані графіка у компактний JSON (атомарно, через тимчасовий файл)
+
+    Args:
+        name: назва графіка (без розширення)
+        payload: JSON-сумісний словник
+        charts_dir: папка даних графіків (за замовчуванням get_charts_path())
+
+    Returns:
+        Шлях до файлу
+    """
+    if charts_dir is None:
+        charts_dir = get_charts_path()
+    else:
+        charts_dir = Path(charts_dir)
+        charts_dir.mkdir(parents=True, exist_ok=True)
+    path = charts_dir / f'{name}.json'
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    os.replace(tmp_path, path)
+    return path
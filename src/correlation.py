@@ -0,0 +1,150 @@
+"""
+Модуль для обчислення кореляцій
+Векторизовані кореляції Пірсона та Спірмена з обробкою пропущених значень
+"""
+
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+
+try:
+    from src.cache import cached, dataframe_fingerprint
+except ImportError:  # запуск як скрипта або з notebooks (src у sys.path)
+    from cache import cached, dataframe_fingerprint
+
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+
+def _numeric_array(df: pd.DataFrame, method: str) -> Tuple[np.ndarray, List[str]]:
+    """
+    Перетворює числові стовпці DataFrame у float-масив (NaN для пропусків).
+    Для методу Спірмена значення замінюються рангами.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(
+            f"Unknown correlation method '{method}'. Use one of: {', '.join(CORRELATION_METHODS)}"
+        )
+
+    numeric = df.select_dtypes(include=[np.number])
+    if method == 'spearman':
+        numeric = numeric.rank(method='average')
+
+    values = numeric.to_numpy(dtype=float, copy=True)
+    values[~np.isfinite(values)] = np.nan
+    return values, numeric.columns.tolist()
+
+
+def correlation_with_target(df: pd.DataFrame,
+                            target: str = 'Life expectancy ',
+                            method: str = 'pearson') -> pd.Series:
+    """
+    Кореляція всіх числових змінних з цільовою змінною без побудови повної матриці.
+    Для кожної пари використовуються лише рядки, де обидва значення присутні.
+
+    Для методу Спірмена ранги обчислюються по всіх наявних значеннях стовпця,
+    тому за наявності пропусків результат може трохи відрізнятися від pandas.
+
+    Args:
+        df: DataFrame
+        target: назва цільової змінної
+        method: 'pearson' або 'spearman'
+
+    Returns:
+        pd.Series з кореляціями (індекс - назви ознак, без target)
+    """
+    if target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found")
+
+    values, columns = _numeric_array(df, method)
+    if target not in columns:
+        raise ValueError(f"Target column '{target}' is not numeric")
+
+    target_idx = columns.index(target)
+    y = values[:, target_idx]
+    X = np.delete(values, target_idx, axis=1)
+    features = columns[:target_idx] + columns[target_idx + 1:]
+
+    # Маска попарно наявних значень: O(n·p) замість O(n·p²) для повної матриці
+    valid = ~np.isnan(X) & ~np.isnan(y)[:, None]
+    counts = valid.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.where(valid, X, 0.0).sum(axis=0) / counts
+        y_mean = np.where(valid, y[:, None], 0.0).sum(axis=0) / counts
+
+        dx = np.where(valid, X - x_mean, 0.0)
+        dy = np.where(valid, y[:, None] - y_mean, 0.0)
+
+        corr = (dx * dy).sum(axis=0) / np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+
+    corr[counts < 2] = np.nan
+    return pd.Series(np.clip(corr, -1.0, 1.0), index=features, name=target)
+
+
+def compute_correlation_matrix(df: pd.DataFrame, method: str = 'pearson') -> pd.DataFrame:
+    """
+    Повна матриця кореляції числових стовпців одним векторизованим обчисленням.
+    Для методу Пірсона пропущені значення обробляються попарно (як у pandas.DataFrame.corr).
+
+    Для методу Спірмена ранги обчислюються один раз по всіх наявних значеннях стовпця,
+    а не окремо для кожної пари, тому за наявності пропусків результат може трохи
+    відрізнятися від pandas (точні попарні ранги - DataFrame.corr(method='spearman')).
+
+    Args:
+        df: DataFrame
+        method: 'pearson' або 'spearman'
+
+    Returns:
+        DataFrame з матрицею кореляції
+    """
+    values, columns = _numeric_array(df, method)
+    valid = ~np.isnan(values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if valid.all():
+            corr = np.corrcoef(values, rowvar=False) if len(values) > 1 else \
+                np.full((len(columns), len(columns)), np.nan)
+        else:
+            # Центрування зменшує похибку округлення, кореляція від зсуву не залежить
+            centered = values - np.nanmean(values, axis=0)
+            z = np.where(valid, centered, 0.0)
+            mask = valid.astype(float)
+
+            counts = mask.T @ mask
+            sums = z.T @ mask                 # sums[i, j] = Σ x_i по рядках, де є i та j
+            sums_sq = (z ** 2).T @ mask
+            cross = z.T @ z
+
+            cov = cross - sums * sums.T / counts
+            var_i = sums_sq - sums ** 2 / counts
+            var_j = var_i.T
+            corr = cov / np.sqrt(var_i * var_j)
+            corr[counts < 2] = np.nan
+
+    corr = np.clip(np.atleast_2d(corr), -1.0, 1.0)
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def get_correlation_matrix(df: pd.DataFrame,
+                           method: str = 'pearson',
+                           use_cache: bool = True) -> pd.DataFrame:
+    """
+    Матриця кореляції з кешуванням за fingerprint даних.
+    Повторні виклики з тими самими даними (у тому ж процесі або через
+    дисковий кеш ANALYTICS_CACHE_DIR) не перераховують матрицю.
+
+    Args:
+        df: DataFrame
+        method: 'pearson' або 'spearman'
+        use_cache: чи використовувати кеш
+
+    Returns:
+        DataFrame з матрицею кореляції
+    """
+    if not use_cache:
+        return compute_correlation_matrix(df, method=method)
+
+    numeric = df.select_dtypes(include=[np.number])
+    key = f"correlation_{method}_{dataframe_fingerprint(numeric)}"
+    return cached(key, lambda: compute_correlation_matrix(numeric, method=method)).copy()
@@ -51,12 +51,13 @@ def locate_dataset_file(filename: str = "Life Expectancy Data.csv") -> Path:
     return canonical_path
 
 
-def load_data(filepath: str = None) -> pd.DataFrame:
+def load_data(filepath: str = None, copy_to_canonical: bool = True) -> pd.DataFrame:
     """
     Завантажує дані про очікувану тривалість життя
     
     Args:
         filepath: шлях до CSV файлу (опціонально)
+        copy_to_canonical: чи копіювати файл з іншої папки в data/raw
         
     Returns:
         pd.DataFrame: завантажені дані
@@ -72,7 +73,7 @@ def load_data(filepath: str = None) -> pd.DataFrame:
     canonical_path = get_data_path(filepath.name)
 
     # Якщо файл знайдено у вкладеній папці, копіюємо його в canonical-шлях для стабільної роботи модулів.
-    if filepath.exists() and filepath != canonical_path and not canonical_path.exists():
+    if copy_to_canonical and filepath.exists() and filepath != canonical_path and not canonical_path.exists():
         try:
             shutil.copy2(filepath, canonical_path)
             print(f"✓ Файл датасету скопійовано до canonical-шляху: {canonical_path}")
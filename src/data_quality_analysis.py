@@ -7,6 +7,11 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 
+try:
+    from src.profiling import profiled
+except ImportError:  # запуск як скрипта або з notebooks (src у sys.path)
+    from profiling import profiled
+
 
 def check_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -137,6 +142,7 @@ def check_data_types(df: pd.DataFrame) -> pd.DataFrame:
     return type_info
 
 
+@profiled
 def generate_quality_report(df: pd.DataFrame) -> Dict:
     """
     Генерує повний звіт про якість даних
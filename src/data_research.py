@@ -3,6 +3,7 @@
 Включає статистичний аналіз, перевірку гіпотез та ML моделі
 """
 
+import os
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
@@ -14,11 +15,22 @@ from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from src.correlation import correlation_with_target
+    from src.preprocessing import FeaturePreprocessor
+    from src.profiling import profiled
+except ImportError:  # запуск як скрипта або з notebooks (src у sys.path)
+    from correlation import correlation_with_target
+    from preprocessing import FeaturePreprocessor
+    from profiling import profiled
 
+
+@profiled
 def prepare_data_for_modeling(df: pd.DataFrame, 
                                target: str = 'Life expectancy ',
                                test_size: float = 0.2,
-                               random_state: int = 42) -> Tuple:
+                               random_state: int = 42,
+                               return_preprocessor: bool = False) -> Tuple:
     """
     Підготовка даних для моделювання
     
@@ -27,63 +39,142 @@ def prepare_data_for_modeling(df: pd.DataFrame,
         target: цільова змінна
         test_size: розмір тестової вибірки
         random_state: random seed
+        return_preprocessor: чи повертати навчений FeaturePreprocessor
         
     Returns:
         Кортеж: (X_train, X_test, y_train, y_test, feature_names)
+        або (X_train, X_test, y_train, y_test, feature_names, preprocessor)
     """
-    # Копіюємо дані
-    data = df.copy()
-    
-    # Видаляємо рядки з пропущеним target
-    if target in data.columns:
-        data = data.dropna(subset=[target])
-    else:
+    if target not in df.columns:
         raise ValueError(f"Target column '{target}' not found in DataFrame")
     
-    # Вибираємо тільки числові стовпці
-    numeric_cols = data.select_dtypes(include=[np.number]).columns.tolist()
-    
-    # Видаляємо target зі списку features
-    if target in numeric_cols:
-        numeric_cols.remove(target)
+    # Рядки з наявним target; копіюємо лише числові ознаки, а не весь DataFrame
+    target_mask = df[target].notna()
+    y = df.loc[target_mask, target]
     
-    # Заповнюємо пропущені значення медіаною без inplace,
-    # щоб стабільно працювало з новими версіями pandas.
-    for col in numeric_cols:
-        if data[col].isnull().sum() > 0:
-            data[col] = data[col].fillna(data[col].median())
+    preprocessor = FeaturePreprocessor(target=target)
+    numeric_cols = preprocessor.select_columns(df)
     
-    X = data[numeric_cols].replace([np.inf, -np.inf], np.nan)
-    y = data[target]
-
-    # Захист від залишкових пропусків у ознаках після заповнення.
-    valid_mask = ~X.isna().any(axis=1)
-    X = X.loc[valid_mask]
-    y = y.loc[valid_mask]
-    
-    # Розділення на train/test
+    # Розділення на train/test до навчання препроцесора: медіани та параметри
+    # стандартизації не повинні залежати від тестових рядків
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=test_size, random_state=random_state
+        df.loc[target_mask, numeric_cols], y, test_size=test_size, random_state=random_state
     )
     
-    return X_train, X_test, y_train, y_test, numeric_cols
+    # Вибір числових ознак, заміна inf та імпутація медіаною одним проходом
+    X_train = preprocessor.fit_transform(X_train)
+    X_test = preprocessor.transform(X_test)
+    
+    feature_names = list(preprocessor.feature_names_)
+    if return_preprocessor:
+        return X_train, X_test, y_train, y_test, feature_names, preprocessor
+    return X_train, X_test, y_train, y_test, feature_names
+
+
+def _raw_features(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Ознаки у float без імпутації (inf вважається пропуском)
+    """
+    X = df[columns].astype(float)
+    return X.where(np.isfinite(X))
+
+
+@profiled
+def prepare_shared_modeling_data(df: pd.DataFrame,
+                                 targets: List[str],
+                                 test_size: float = 0.2,
+                                 random_state: int = 42) -> Dict:
+    """
+    Спільна підготовка даних для кількох цільових змінних
+
+    Матриця ознак і train/test поділ обчислюються один раз для всіх рядків
+    (один поділ, без CV-фолдів); для кожної цільової змінної далі беруться
+    лише рядки, де вона наявна, і на її train-рядках навчається імпутація
+    та стандартизація (див. split_shared_modeling_data).
+
+    Args:
+        df: вхідний DataFrame
+        targets: список цільових змінних
+        test_size: розмір тестової вибірки
+        random_state: random seed
+
+    Returns:
+        Словник з сирою матрицею ознак, маскою тестових рядків і targets
+    """
+    missing_targets = [target for target in targets if target not in df.columns]
+    if missing_targets:
+        raise ValueError(f"Target columns not found in DataFrame: {missing_targets}")
+
+    X = _raw_features(df, FeaturePreprocessor().select_columns(df))
+
+    _, test_positions = train_test_split(
+        np.arange(len(df)), test_size=test_size, random_state=random_state
+    )
+    is_test = np.zeros(len(df), dtype=bool)
+    is_test[test_positions] = True
+
+    return {
+        'X': X,
+        'is_test': is_test,
+        'targets': df[list(targets)],
+    }
+
+
+@profiled
+def split_shared_modeling_data(shared: Dict, target: str) -> Tuple:
+    """
+    Train/test вибірки для однієї цільової змінної зі спільної підготовки
+
+    Препроцесор навчається лише на train-рядках, де target наявний,
+    а тестові рядки тільки перетворюються.
+
+    Args:
+        shared: результат prepare_shared_modeling_data
+        target: цільова змінна
+
+    Returns:
+        Кортеж: (X_train, X_test, y_train, y_test, feature_names, preprocessor)
+    """
+    y_all = shared['targets'][target]
+    has_target = y_all.notna().to_numpy()
+    train_mask = has_target & ~shared['is_test']
+    test_mask = has_target & shared['is_test']
 
+    columns = [col for col in shared['X'].columns if col != target]
+    preprocessor = FeaturePreprocessor(target=target, features=columns)
+    X_train = preprocessor.fit_transform(shared['X'].loc[train_mask, columns])
+    X_test = preprocessor.transform(shared['X'].loc[test_mask, columns])
 
-def train_linear_regression(X_train, y_train, X_test, y_test) -> Dict:
+    return (X_train, X_test,
+            y_all.loc[train_mask], y_all.loc[test_mask],
+            list(preprocessor.feature_names_), preprocessor)
+
+
+@profiled
+def train_linear_regression(X_train, y_train, X_test, y_test,
+                            preprocessor: Optional[FeaturePreprocessor] = None) -> Dict:
     """
     Навчання лінійної регресії
     
     Args:
         X_train, y_train: тренувальні дані
         X_test, y_test: тестові дані
+        preprocessor: навчений FeaturePreprocessor (його стандартизація та
+            закешовані матриці використовуються замість нового StandardScaler;
+            у результаті 'scaler' - StandardScaler з тими самими параметрами)
         
     Returns:
         Словник з моделлю та метриками
     """
     # Нормалізація
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    if preprocessor is not None:
+        scaler = preprocessor.to_standard_scaler()
+        X_train_scaled = preprocessor.scale(X_train)
+        X_test_scaled = preprocessor.scale(X_test)
+    else:
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
     
     # Навчання моделі
     model = LinearRegression()
@@ -97,6 +188,7 @@ def train_linear_regression(X_train, y_train, X_test, y_test) -> Dict:
     results = {
         'model': model,
         'scaler': scaler,
+        'preprocessor': preprocessor,
         'train_metrics': {
             'r2': r2_score(y_train, y_train_pred),
             'rmse': np.sqrt(mean_squared_error(y_train, y_train_pred)),
@@ -116,10 +208,12 @@ def train_linear_regression(X_train, y_train, X_test, y_test) -> Dict:
     return results
 
 
+@profiled
 def train_random_forest(X_train, y_train, X_test, y_test, 
                         n_estimators: int = 100,
                         max_depth: Optional[int] = None,
-                        random_state: int = 42) -> Dict:
+                        random_state: int = 42,
+                        preprocessor: Optional[FeaturePreprocessor] = None) -> Dict:
     """
     Навчання Random Forest
     
@@ -129,6 +223,7 @@ def train_random_forest(X_train, y_train, X_test, y_test,
         n_estimators: кількість дерев
         max_depth: максимальна глибина дерева
         random_state: random seed
+        preprocessor: навчений FeaturePreprocessor (зберігається разом з моделлю)
         
     Returns:
         Словник з моделлю та метриками
@@ -149,6 +244,7 @@ def train_random_forest(X_train, y_train, X_test, y_test,
     # Метрики
     results = {
         'model': model,
+        'preprocessor': preprocessor,
         'train_metrics': {
             'r2': r2_score(y_train, y_train_pred),
             'rmse': np.sqrt(mean_squared_error(y_train, y_train_pred)),
@@ -169,11 +265,13 @@ def train_random_forest(X_train, y_train, X_test, y_test,
     return results
 
 
+@profiled
 def train_gradient_boosting(X_train, y_train, X_test, y_test,
                             n_estimators: int = 100,
                             learning_rate: float = 0.1,
                             max_depth: int = 3,
-                            random_state: int = 42) -> Dict:
+                            random_state: int = 42,
+                            preprocessor: Optional[FeaturePreprocessor] = None) -> Dict:
     """
     Навчання Gradient Boosting
     
@@ -184,6 +282,7 @@ def train_gradient_boosting(X_train, y_train, X_test, y_test,
         learning_rate: швидкість навчання
         max_depth: максимальна глибина дерева
         random_state: random seed
+        preprocessor: навчений FeaturePreprocessor (зберігається разом з моделлю)
         
     Returns:
         Словник з моделлю та метриками
@@ -204,6 +303,7 @@ def train_gradient_boosting(X_train, y_train, X_test, y_test,
     # Метрики
     results = {
         'model': model,
+        'preprocessor': preprocessor,
         'train_metrics': {
             'r2': r2_score(y_train, y_train_pred),
             'rmse': np.sqrt(mean_squared_error(y_train, y_train_pred)),
@@ -250,6 +350,136 @@ def compare_models(results_dict: Dict[str, Dict]) -> pd.DataFrame:
     return pd.DataFrame(comparison).round(4)
 
 
+def _regression_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
+    """
+    Метрики регресії; R² не визначений для менше ніж двох спостережень
+    """
+    if len(y_true) == 0:
+        return {'r2': None, 'rmse': None, 'mae': None}
+    return {
+        'r2': r2_score(y_true, y_pred) if len(y_true) > 1 else None,
+        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'mae': mean_absolute_error(y_true, y_pred)
+    }
+
+
+def _bootstrap_metric_arrays(y_true: np.ndarray, y_pred: np.ndarray,
+                             indices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Метрики для кожної бутстреп-вибірки (рядок матриці індексів) без циклів
+    """
+    yt = y_true[indices]
+    err = yt - y_pred[indices]
+    sse = np.einsum('ij,ij->i', err, err)
+    centered = yt - yt.mean(axis=1, keepdims=True)
+    sst = np.einsum('ij,ij->i', centered, centered)
+    n = indices.shape[1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r2 = np.where(sst > 0, 1.0 - sse / sst, np.nan)
+
+    return {
+        'r2': r2,
+        'rmse': np.sqrt(sse / n),
+        'mae': np.abs(err).mean(axis=1)
+    }
+
+
+def bootstrap_model_metrics(results_dict: Dict[str, Dict],
+                            y_true,
+                            n_resamples: int = 1000,
+                            confidence: float = 0.95,
+                            chunk_size: int = 200,
+                            random_state: int = 42) -> Dict[str, pd.DataFrame]:
+    """
+    Бутстреп довірчі інтервали для тестових метрик моделей та їх попарних різниць
+
+    Вибірки задаються матрицею індексів, яка застосовується до збережених
+    прогнозів усіх моделей одночасно (парний бутстреп), тож sklearn-метрики
+    не перераховуються в циклі. Пам'ять обмежена розміром chunk_size × n.
+
+    Args:
+        results_dict: словник з результатами моделей (містить predictions.y_test_pred)
+        y_true: фактичні значення тестової вибірки
+        n_resamples: кількість бутстреп-вибірок
+        confidence: рівень довіри
+        chunk_size: кількість вибірок, що обробляються за раз
+        random_state: random seed
+
+    Returns:
+        Словник: {'intervals': DataFrame, 'differences': DataFrame}
+    """
+    if int(n_resamples) < 1:
+        raise ValueError(f"n_resamples must be at least 1, got {n_resamples}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+    n_resamples = int(n_resamples)
+
+    y_true = np.asarray(y_true, dtype=float)
+    predictions = {
+        name: np.asarray(results['predictions']['y_test_pred'], dtype=float)
+        for name, results in results_dict.items()
+    }
+    n = len(y_true)
+    if n == 0:
+        raise ValueError("Bootstrap requires at least one test observation")
+    chunk_size = max(1, int(chunk_size))
+
+    rng = np.random.default_rng(random_state)
+    samples = {name: {'r2': [], 'rmse': [], 'mae': []} for name in predictions}
+    for start in range(0, n_resamples, chunk_size):
+        indices = rng.integers(0, n, size=(min(chunk_size, n_resamples - start), n))
+        for name, y_pred in predictions.items():
+            for metric, values in _bootstrap_metric_arrays(y_true, y_pred, indices).items():
+                samples[name][metric].append(values)
+
+    samples = {
+        name: {metric: np.concatenate(chunks) for metric, chunks in metrics.items()}
+        for name, metrics in samples.items()
+    }
+    alpha = (1 - confidence) / 2 * 100
+
+    def _interval(values: np.ndarray) -> Tuple[float, float]:
+        low, high = np.nanpercentile(values, [alpha, 100 - alpha])
+        return low, high
+
+    intervals = []
+    for name, y_pred in predictions.items():
+        point = _regression_metrics(y_true, y_pred)
+        for metric, values in samples[name].items():
+            low, high = _interval(values)
+            intervals.append({
+                'Model': name,
+                'Metric': metric,
+                'Estimate': point[metric],
+                'CI Low': low,
+                'CI High': high,
+            })
+
+    # Парні різниці: однакові вибірки для обох моделей
+    differences = []
+    names = list(predictions)
+    for i, first in enumerate(names):
+        for second in names[i + 1:]:
+            for metric in ('r2', 'rmse', 'mae'):
+                diff = samples[first][metric] - samples[second][metric]
+                low, high = _interval(diff)
+                differences.append({
+                    'Model A': first,
+                    'Model B': second,
+                    'Metric': metric,
+                    'Mean Difference': np.nanmean(diff),
+                    'CI Low': low,
+                    'CI High': high,
+                    'Significant': bool(low > 0 or high < 0),
+                })
+
+    return {
+        'intervals': pd.DataFrame(intervals),
+        'differences': pd.DataFrame(differences),
+    }
+
+
 def get_feature_importance(results: Dict, top_n: int = 10) -> pd.DataFrame:
     """
     Отримати найважливіші ознаки для моделей на основі дерев
@@ -275,7 +505,8 @@ def get_feature_importance(results: Dict, top_n: int = 10) -> pd.DataFrame:
 
 def calculate_correlation_with_target(df: pd.DataFrame, 
                                       target: str = 'Life expectancy ',
-                                      top_n: int = 10) -> pd.DataFrame:
+                                      top_n: int = 10,
+                                      method: str = 'pearson') -> pd.DataFrame:
     """
     Розрахунок кореляції змінних з цільовою змінною
     
@@ -283,6 +514,7 @@ def calculate_correlation_with_target(df: pd.DataFrame,
         df: DataFrame
         target: назва цільової змінної
         top_n: кількість топ корельованих змінних
+        method: 'pearson' або 'spearman'
         
     Returns:
         DataFrame з кореляціями
@@ -290,8 +522,8 @@ def calculate_correlation_with_target(df: pd.DataFrame,
     if target not in df.columns:
         raise ValueError(f"Target column '{target}' not found")
     
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    correlations = df[numeric_cols].corr()[target].drop(target).sort_values(
+    # Обчислюємо лише вектор кореляцій з target, а не всю матрицю
+    correlations = correlation_with_target(df, target=target, method=method).sort_values(
         ascending=False, key=abs
     )
     
@@ -303,6 +535,250 @@ def calculate_correlation_with_target(df: pd.DataFrame,
     return result
 
 
+def _make_group_model(model_type: str, random_state: int):
+    """
+    Створює модель для групового навчання (одне ядро на модель:
+    паралелізм забезпечується пулом процесів)
+    """
+    if model_type == 'linear':
+        return LinearRegression()
+    if model_type == 'random_forest':
+        return RandomForestRegressor(n_estimators=100, random_state=random_state, n_jobs=1)
+    if model_type == 'gradient_boosting':
+        return GradientBoostingRegressor(random_state=random_state)
+    raise ValueError(
+        f"Unknown model type '{model_type}'. Use 'linear', 'random_forest' or 'gradient_boosting'"
+    )
+
+
+def _train_medians(X_train: np.ndarray, fallback: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Медіани ознак лише за train-рядками; стовпці без значень беруть fallback
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        medians = np.nanmedian(X_train, axis=0) if len(X_train) else np.full(X_train.shape[1], np.nan)
+    if fallback is not None:
+        medians = np.where(np.isnan(medians), fallback, medians)
+    return medians
+
+
+def _impute(X: np.ndarray, medians: np.ndarray) -> np.ndarray:
+    """
+    Копія матриці з пропусками, заповненими медіанами
+    """
+    X = X.copy()
+    missing = np.isnan(X)
+    if missing.any():
+        X[missing] = np.take(medians, np.nonzero(missing)[1])
+    return X
+
+
+# Стан процесу-воркера: матриця [X | y | is_test] у спільній пам'яті
+_GROUP_WORKER_STATE: Dict = {}
+
+
+def _init_group_worker(shm_name: str, shape: Tuple[int, int],
+                       model_type: str, random_state: int,
+                       fallback_medians: np.ndarray) -> None:
+    """
+    Ініціалізація воркера: підключення до спільної матриці без її копіювання
+    """
+    import multiprocessing.util
+    from multiprocessing import shared_memory
+
+    # Сегментом володіє батьківський процес: він видаляє його після завершення пулу,
+    # а воркер лише закриває свій дескриптор під час завершення
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _GROUP_WORKER_STATE.update({
+        'shm': shm,
+        'data': np.ndarray(shape, dtype=np.float64, buffer=shm.buf),
+        'model_type': model_type,
+        'random_state': random_state,
+        'fallback_medians': fallback_medians,
+    })
+    # Воркери пулу завершуються через os._exit, тому atexit у них не спрацьовує
+    multiprocessing.util.Finalize(None, _close_group_worker, exitpriority=10)
+
+
+def _close_group_worker() -> None:
+    """
+    Закриття спільної пам'яті у воркері (масив-представлення звільняється першим)
+    """
+    _GROUP_WORKER_STATE.pop('data', None)
+    shm = _GROUP_WORKER_STATE.pop('shm', None)
+    if shm is not None:
+        shm.close()
+
+
+def _fit_group_rows(data: np.ndarray, model_type: str, random_state: int,
+                    fallback_medians: np.ndarray) -> Dict:
+    """
+    Навчання та оцінка моделі для рядків однієї групи матриці [X | y | is_test]
+
+    Пропуски ознак заповнюються медіанами train-рядків цієї групи
+    (тестові рядки на імпутацію не впливають)
+    """
+    X, y, is_test = data[:, :-2], data[:, -2], data[:, -1] > 0
+
+    medians = _train_medians(X[~is_test], fallback_medians)
+    model = _make_group_model(model_type, random_state)
+    model.fit(_impute(X[~is_test], medians), y[~is_test])
+    return _regression_metrics(y[is_test], model.predict(_impute(X[is_test], medians)))
+
+
+def _fit_group(start: int, stop: int) -> Dict:
+    """
+    Задача воркера: група - це рядки [start, stop) спільної матриці
+    """
+    return _fit_group_rows(_GROUP_WORKER_STATE['data'][start:stop],
+                           _GROUP_WORKER_STATE['model_type'],
+                           _GROUP_WORKER_STATE['random_state'],
+                           _GROUP_WORKER_STATE['fallback_medians'])
+
+
+@profiled
+def train_grouped_models(df: pd.DataFrame,
+                         group_col: str = 'Country',
+                         target: str = 'Life expectancy ',
+                         model_type: str = 'random_forest',
+                         min_group_size: int = 10,
+                         test_size: float = 0.2,
+                         random_state: int = 42,
+                         n_jobs: Optional[int] = None,
+                         features: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Навчання окремої моделі для кожної групи (наприклад, країни або статусу)
+
+    Кожна група ділиться на train/test у пропорції test_size. Пропуски ознак
+    заповнюються медіанами train-рядків (для моделі групи - її власних, для
+    глобальної - усіх груп). Групи з меншою кількістю рядків, ніж min_group_size,
+    оцінюються глобальною моделлю, навченою на train-рядках усіх груп. Групи розподіляються по пулу процесів
+    від найбільшої до найменшої, а матриця ознак передається воркерам через
+    спільну пам'ять один раз.
+
+    Args:
+        df: DataFrame
+        group_col: колонка для групування
+        target: цільова змінна
+        model_type: 'linear', 'random_forest' або 'gradient_boosting'
+        min_group_size: мінімальний розмір групи для власної моделі
+        test_size: частка тестових рядків у кожній групі
+        random_state: random seed
+        n_jobs: кількість процесів (None - усі ядра, 1 - послідовно)
+        features: готова матриця ознак без імпутації (NaN - пропуск) з тим самим
+            індексом, що й df (наприклад, зі спільної підготовки); інакше ознаки
+            готуються тут
+
+    Returns:
+        DataFrame з метриками по групах (власна та глобальна модель)
+    """
+    if group_col not in df.columns:
+        raise ValueError(f"Group column '{group_col}' not found in DataFrame")
+    if target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found in DataFrame")
+    _make_group_model(model_type, random_state)
+
+    mask = df[target].notna() & df[group_col].notna()
+    if features is not None:
+        columns = [col for col in features.columns if col not in (target, group_col)]
+        X = features.loc[mask, columns]
+    else:
+        # Сирі ознаки: імпутація навчається вже після поділу на train/test
+        columns = [col for col in FeaturePreprocessor(target=target).select_columns(df) if col != group_col]
+        X = _raw_features(df.loc[mask], columns)
+    y = df.loc[mask, target].to_numpy(dtype=float)
+
+    # Сортування рядків за групою: кожна група - неперервний діапазон матриці
+    codes, groups = pd.factorize(df.loc[mask, group_col], sort=True)
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    sizes = np.bincount(codes, minlength=len(groups))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    # Випадковий train/test поділ усередині кожної групи
+    rng = np.random.default_rng(random_state)
+    position = np.empty(len(codes), dtype=np.int64)
+    position[np.lexsort((rng.random(len(codes)), codes))] = np.arange(len(codes))
+    position -= starts[codes]
+    n_test = np.where(sizes > 1, np.maximum(1, np.round(sizes * test_size)), 0).astype(int)
+    is_test = position < n_test[codes]
+
+    matrix = np.empty((len(codes), X.shape[1] + 2), dtype=np.float64)
+    matrix[:, :-2] = X.to_numpy()[order]
+    matrix[:, -2] = y[order]
+    matrix[:, -1] = is_test
+
+    # Стовпці без жодного значення серед train-рядків не є ознаками
+    global_medians = _train_medians(matrix[~is_test, :-2])
+    empty = np.flatnonzero(np.isnan(global_medians))
+    if len(empty):
+        matrix = np.delete(matrix, empty, axis=1)
+        global_medians = np.delete(global_medians, empty)
+
+    # Глобальна модель: fallback для малих груп і база для порівняння
+    global_model = _make_group_model(model_type, random_state)
+    if model_type == 'random_forest':
+        global_model.set_params(n_jobs=-1)
+    global_model.fit(_impute(matrix[~is_test, :-2], global_medians), matrix[~is_test, -2])
+    global_pred = np.full(len(codes), np.nan)
+    global_pred[is_test] = global_model.predict(_impute(matrix[is_test, :-2], global_medians))
+
+    train_sizes = sizes - n_test
+    eligible = [g for g in np.argsort(-sizes, kind='stable')
+                if sizes[g] >= min_group_size and n_test[g] > 0 and train_sizes[g] > 1]
+
+    group_metrics: Dict[int, Dict] = {}
+    workers = n_jobs or os.cpu_count() or 1
+    if workers == 1 or len(eligible) <= 1:
+        for g in eligible:
+            group_metrics[g] = _fit_group_rows(matrix[starts[g]:starts[g] + sizes[g]],
+                                               model_type, random_state, global_medians)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+        try:
+            np.ndarray(matrix.shape, dtype=np.float64, buffer=shm.buf)[:] = matrix
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(eligible)),
+                initializer=_init_group_worker,
+                initargs=(shm.name, matrix.shape, model_type, random_state, global_medians),
+            ) as executor:
+                # Найбільші групи подаються першими для рівномірного завантаження
+                futures = {g: executor.submit(_fit_group, int(starts[g]), int(starts[g] + sizes[g]))
+                           for g in eligible}
+                for g, future in futures.items():
+                    group_metrics[g] = future.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    rows = []
+    for g in np.argsort(-sizes, kind='stable'):
+        rows_slice = slice(starts[g], starts[g] + sizes[g])
+        test_slice = matrix[rows_slice, -1] > 0
+        global_metrics = _regression_metrics(matrix[rows_slice, -2][test_slice],
+                                             global_pred[rows_slice][test_slice])
+        metrics = group_metrics.get(g, global_metrics)
+        rows.append({
+            'group': groups[g],
+            'rows': int(sizes[g]),
+            'train_rows': int(train_sizes[g]),
+            'test_rows': int(n_test[g]),
+            'model': 'group' if g in group_metrics else 'global',
+            'r2': metrics['r2'],
+            'rmse': metrics['rmse'],
+            'mae': metrics['mae'],
+            'global_r2': global_metrics['r2'],
+            'global_rmse': global_metrics['rmse'],
+            'global_mae': global_metrics['mae'],
+        })
+
+    return pd.DataFrame(rows)
+
+
 if __name__ == "__main__":
     # Приклад використання
     import sys
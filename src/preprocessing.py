@@ -0,0 +1,225 @@
+"""
+Модуль для підготовки ознак до моделювання
+Навчений препроцесор: вибір стовпців, обробка inf, імпутація медіаною, стандартизація
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from sklearn.preprocessing import StandardScaler
+
+
+class FeaturePreprocessor:
+    """
+    Препроцесор числових ознак, що запам'ятовує параметри навчання.
+
+    Після fit() ті самі медіани та параметри стандартизації застосовуються
+    до нових даних, тому інференс узгоджений з навчанням. Об'єкт серіалізується
+    через pickle (разом з моделлю) або через to_dict()/from_dict() у JSON.
+    """
+
+    def __init__(self, target: Optional[str] = None, features: Optional[List[str]] = None):
+        """
+        Args:
+            target: цільова змінна (виключається з ознак)
+            features: явний список ознак (за замовчуванням усі числові стовпці)
+        """
+        self.target = target
+        self.features = features
+        self.feature_names_: List[str] = []
+        self.medians_: Optional[np.ndarray] = None
+        self.mean_: Optional[np.ndarray] = None
+        self.scale_: Optional[np.ndarray] = None
+        self.n_samples_ = 0
+        self._scaled_cache: Dict[int, tuple] = {}
+
+    def select_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Стовпці-кандидати в ознаки: явний список або всі числові, крім target
+        """
+        if self.features is not None:
+            return [col for col in self.features if col != self.target]
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        return [col for col in numeric_cols if col != self.target]
+
+    @staticmethod
+    def _to_array(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        """
+        Одна копія ознак у float-масив; inf вважається пропуском.
+        Відсутні у df стовпці заповнюються NaN (і далі медіаною).
+        """
+        data = df.reindex(columns=columns) if not set(columns).issubset(df.columns) else df[columns]
+        values = data.to_numpy(dtype=float, copy=True)
+        values[~np.isfinite(values)] = np.nan
+        return values
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.medians_ is not None
+
+    def fit(self, df: pd.DataFrame) -> 'FeaturePreprocessor':
+        """
+        Навчання препроцесора одним векторизованим проходом
+
+        Args:
+            df: DataFrame з ознаками
+
+        Returns:
+            self
+        """
+        columns = self.select_columns(df)
+        self._fit_array(self._to_array(df, columns), columns)
+        return self
+
+    def _fit_array(self, values: np.ndarray, columns: List[str]) -> np.ndarray:
+        # Медіани всіх стовпців одним викликом; стовпці без жодного значення відкидаємо
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            medians = np.nanmedian(values, axis=0) if len(values) else np.full(len(columns), np.nan)
+        keep = ~np.isnan(medians)
+
+        values = values[:, keep]
+        medians = medians[keep]
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = np.take(medians, np.nonzero(missing)[1])
+
+        scale = values.std(axis=0) if len(values) else np.ones(len(medians))
+        scale[scale == 0] = 1.0
+
+        self.feature_names_ = [col for col, k in zip(columns, keep) if k]
+        self.medians_ = medians
+        self.mean_ = values.mean(axis=0) if len(values) else np.zeros(len(medians))
+        self.scale_ = scale
+        self.n_samples_ = len(values)
+        self._scaled_cache.clear()
+        return values
+
+    def _check_fitted(self) -> None:
+        if not self.is_fitted:
+            raise ValueError("FeaturePreprocessor is not fitted yet. Call fit() first.")
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Вибір ознак, заміна inf та імпутація навченими медіанами
+
+        Args:
+            df: DataFrame з даними
+
+        Returns:
+            DataFrame з ознаками без пропусків (індекс збережено)
+        """
+        self._check_fitted()
+        values = self._to_array(df, self.feature_names_)
+        missing = np.isnan(values)
+        if missing.any():
+            values[missing] = np.take(self.medians_, np.nonzero(missing)[1])
+        return pd.DataFrame(values, index=df.index, columns=self.feature_names_)
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Навчання та перетворення за один прохід (без повторного копіювання даних)
+
+        Args:
+            df: DataFrame з ознаками
+
+        Returns:
+            DataFrame з ознаками без пропусків
+        """
+        columns = self.select_columns(df)
+        values = self._fit_array(self._to_array(df, columns), columns)
+        return pd.DataFrame(values, index=df.index, columns=self.feature_names_)
+
+    def scale(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Стандартизація вже імпутованих ознак. Результат кешується для того самого
+        об'єкта X, тож усі моделі в межах запуску використовують одну матрицю.
+
+        Args:
+            X: DataFrame з ознаками (результат transform)
+
+        Returns:
+            np.ndarray зі стандартизованими ознаками
+        """
+        self._check_fitted()
+        cached = self._scaled_cache.get(id(X))
+        if cached is not None and cached[0] is X:
+            return cached[1]
+
+        values = X[self.feature_names_].to_numpy(dtype=float) if isinstance(X, pd.DataFrame) \
+            else np.asarray(X, dtype=float)
+        scaled = (values - self.mean_) / self.scale_
+        scaled.setflags(write=False)
+        # Тримаємо посилання на X, щоб id не був перевикористаний іншим об'єктом
+        self._scaled_cache[id(X)] = (X, scaled)
+        return scaled
+
+    def to_standard_scaler(self) -> StandardScaler:
+        """
+        StandardScaler з навченими параметрами стандартизації (для коду,
+        що очікує sklearn-скейлер: transform повертає стандартизовану матрицю)
+
+        Returns:
+            StandardScaler
+        """
+        self._check_fitted()
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean_.copy()
+        scaler.scale_ = self.scale_.copy()
+        scaler.var_ = self.scale_ ** 2
+        scaler.n_features_in_ = len(self.feature_names_)
+        scaler.feature_names_in_ = np.asarray(self.feature_names_, dtype=object)
+        scaler.n_samples_seen_ = self.n_samples_
+        return scaler
+
+    def subset(self, columns: List[str]) -> 'FeaturePreprocessor':
+        """
+        Препроцесор лише для частини навчених ознак (без повторного навчання)
+
+        Args:
+            columns: список ознак
+
+        Returns:
+            FeaturePreprocessor
+        """
+        self._check_fitted()
+        positions = [self.feature_names_.index(col) for col in columns]
+        result = FeaturePreprocessor(target=self.target, features=list(columns))
+        result.feature_names_ = list(columns)
+        result.medians_ = self.medians_[positions]
+        result.mean_ = self.mean_[positions]
+        result.scale_ = self.scale_[positions]
+        result.n_samples_ = self.n_samples_
+        return result
+
+    def to_dict(self) -> Dict:
+        """
+        Параметри препроцесора у JSON-сумісному вигляді
+        """
+        self._check_fitted()
+        return {
+            'target': self.target,
+            'features': self.feature_names_,
+            'medians': self.medians_.tolist(),
+            'mean': self.mean_.tolist(),
+            'scale': self.scale_.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict) -> 'FeaturePreprocessor':
+        """
+        Відновлення препроцесора з результату to_dict()
+        """
+        result = cls(target=payload.get('target'), features=list(payload['features']))
+        result.feature_names_ = list(payload['features'])
+        result.medians_ = np.asarray(payload['medians'], dtype=float)
+        result.mean_ = np.asarray(payload['mean'], dtype=float)
+        result.scale_ = np.asarray(payload['scale'], dtype=float)
+        return result
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state['_scaled_cache'] = {}
+        return state
+
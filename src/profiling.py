@@ -0,0 +1,312 @@
+"""
+Модуль для профілювання публічних функцій аналізу
+Вмикається змінною оточення PROFILE; без неї декоратор повертає функцію без змін
+"""
+
+import cProfile
+import functools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+
+# Режими профілювання: calls - кількість викликів і сумарний час (завжди, коли PROFILE увімкнено),
+# cprofile - pstats-дамп, sample - семплінг стеків у collapsed-формат для flame graph,
+# tracemalloc - знімок виділень пам'яті
+PROFILE_MODES = ('calls', 'cprofile', 'sample', 'tracemalloc')
+
+
+def _parse_modes(value: str) -> Set[str]:
+    """
+    Розбір значення PROFILE: '1'/'calls', 'all' або перелік режимів через кому
+    """
+    value = value.strip().lower()
+    if value in {'', '0', 'false', 'no', 'off'}:
+        return set()
+    if value in {'1', 'true', 'yes', 'on'}:
+        return {'calls'}
+    if value == 'all':
+        return set(PROFILE_MODES)
+    modes = {mode.strip() for mode in value.split(',') if mode.strip()} & set(PROFILE_MODES)
+    return modes | {'calls'}
+
+
+# Читається один раз під час імпорту: вимкнене профілювання не додає жодної обгортки
+_MODES = _parse_modes(os.getenv('PROFILE', ''))
+
+
+def profiling_enabled() -> bool:
+    """
+    Чи увімкнено профілювання в цьому процесі
+    """
+    return bool(_MODES)
+
+
+def get_profiles_path() -> Path:
+    """
+    Повертає шлях до директорії профілів (PROFILE_DIR або runtime/profiles)
+    """
+    env_dir = os.getenv('PROFILE_DIR')
+    profiles_path = Path(env_dir) if env_dir else Path(__file__).parent.parent / 'runtime' / 'profiles'
+    profiles_path.mkdir(parents=True, exist_ok=True)
+    return profiles_path
+
+
+class _Session:
+    """
+    Стан профілювання одного процесу між викликами write_profiles
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.calls: Dict[str, Dict[str, float]] = {}
+        # Потоки, що зараз виконують профільовану функцію: {ident: глибина}
+        self.active: Counter = Counter()
+        # cProfile профілює лише потік, у якому його ввімкнено, тому - окремий профіль на потік
+        self.profiles: Dict[int, cProfile.Profile] = {}
+        self.profile_skipped = 0
+        self.stacks: Counter = Counter()
+        self.sampler: Optional[threading.Thread] = None
+        self.stop = threading.Event()
+        if 'tracemalloc' in _MODES and not tracemalloc.is_tracing():
+            tracemalloc.start(int(os.getenv('PROFILE_TRACEMALLOC_FRAMES', '1')))
+        if 'sample' in _MODES:
+            self.sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+            self.sampler.start()
+
+    def _sample(self) -> None:
+        interval = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))
+        own = threading.get_ident()
+        while not self.stop.wait(interval):
+            frames = sys._current_frames()
+            for ident in list(self.active):
+                frame = frames.get(ident)
+                if ident == own or frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = frame.f_globals.get('__name__', '?')
+                    # Обгортки profiled не потрапляють у стеки
+                    if module != __name__:
+                        stack.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start_profile(self) -> Optional[cProfile.Profile]:
+        """
+        Вмикає cProfile поточного потоку; None, якщо режим вимкнено або
+        інтерпретатор не дозволяє кілька профайлерів одночасно (Python 3.12+)
+        """
+        if 'cprofile' not in _MODES:
+            return None
+        ident = threading.get_ident()
+        with self.lock:
+            profile = self.profiles.setdefault(ident, cProfile.Profile())
+        try:
+            profile.enable()
+        except ValueError:
+            with self.lock:
+                self.profile_skipped += 1
+            return None
+        return profile
+
+    def close(self) -> None:
+        self.stop.set()
+        if self.sampler is not None:
+            self.sampler.join()
+
+
+_SESSION: Optional[_Session] = None
+# Зовнішні сесії, відкладені вкладеними start_profiling (наприклад, етапи всередині pipeline)
+_OUTER_SESSIONS: List[_Session] = []
+_SESSION_LOCK = threading.Lock()
+
+
+def _current_session() -> _Session:
+    """
+    Сесія поточного процесу; у дочірньому процесі (fork) створюється нова,
+    а її результати записуються під час завершення процесу
+    """
+    global _SESSION
+    session = _SESSION
+    if session is not None and session.pid == os.getpid():
+        return session
+    with _SESSION_LOCK:
+        if _SESSION is None or _SESSION.pid != os.getpid():
+            name = _SESSION.name if _SESSION is not None else 'process'
+            if _SESSION is not None:
+                # cProfile батьківського процесу міг бути ввімкнений у момент fork
+                sys.setprofile(None)
+            if multiprocessing.parent_process() is not None:
+                name = f"{name}-worker-{os.getpid()}"
+            _SESSION = _Session(name)
+            if multiprocessing.parent_process() is not None:
+                # Воркери пулів завершуються через os._exit, тому atexit у них не спрацьовує
+                multiprocessing.util.Finalize(None, write_profiles, exitpriority=10)
+        return _SESSION
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Декоратор: рахує виклики та сумарний час функції, а в режимах cprofile/sample
+    профілює її виконання
+
+    Args:
+        func: функція для профілювання
+
+    Returns:
+        Callable: обгортка або сама функція, якщо профілювання вимкнено
+    """
+    if not _MODES:
+        return func
+
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _current_session()
+        active = session.local.__dict__.setdefault('active', [])
+        # Рекурсивні та вкладені виклики тієї ж функції не рахуються в час двічі
+        outer_call = name not in active
+        ident = threading.get_ident()
+
+        with session.lock:
+            session.active[ident] += 1
+        # Профіль потоку вмикається лише на зовнішньому профільованому виклику
+        profile = session.start_profile() if len(active) == 0 else None
+        active.append(name)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            active.pop()
+            if profile is not None:
+                profile.disable()
+            with session.lock:
+                session.active[ident] -= 1
+                if session.active[ident] <= 0:
+                    del session.active[ident]
+                stats = session.calls.setdefault(name, {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+                stats['calls'] += 1
+                if outer_call:
+                    stats['total_seconds'] += elapsed
+                    stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    return wrapper
+
+
+def start_profiling(name: str) -> None:
+    """
+    Починає нову сесію профілювання (наприклад, на початку етапу пайплайну).
+    Поточна сесія процесу не втрачається: вона відкладається і знову стає
+    поточною після write_profiles вкладеної сесії.
+
+    Args:
+        name: назва сесії, з якою будуть записані файли профілю
+    """
+    global _SESSION
+    if not _MODES:
+        return
+    with _SESSION_LOCK:
+        # Сесії батьківського процесу (успадковані через fork) тут не записуються
+        _OUTER_SESSIONS[:] = [session for session in _OUTER_SESSIONS if session.pid == os.getpid()]
+        if _SESSION is not None and _SESSION.pid == os.getpid():
+            _OUTER_SESSIONS.append(_SESSION)
+        _SESSION = _Session(name)
+
+
+def write_profiles(name: Optional[str] = None) -> Dict[str, str]:
+    """
+    Записує результати поточної сесії в PROFILE_DIR; поточною знову стає
+    відкладена зовнішня сесія (якщо є), інакше наступний виклик почне нову
+
+    Створює <name>_calls.json (виклики та час функцій), а залежно від режимів -
+    <name>.pstats, <name>.collapsed (для flamegraph.pl / speedscope) та <name>.tracemalloc
+
+    Args:
+        name: назва файлів (за замовчуванням - назва сесії)
+
+    Returns:
+        Dict[str, str]: шляхи до записаних файлів за типом
+    """
+    global _SESSION
+    if not _MODES:
+        return {}
+    with _SESSION_LOCK:
+        session = _SESSION
+        if session is None or session.pid != os.getpid():
+            return {}
+        _SESSION = None
+        while _OUTER_SESSIONS:
+            outer = _OUTER_SESSIONS.pop()
+            if outer.pid == os.getpid():
+                _SESSION = outer
+                break
+    session.close()
+
+    name = name or session.name
+    profiles_path = get_profiles_path()
+    outputs = {}
+
+    calls = dict(sorted(session.calls.items(), key=lambda item: item[1]['total_seconds'], reverse=True))
+    summary = {'name': name, 'pid': session.pid, 'modes': sorted(_MODES), 'functions': calls}
+
+    # Профілі всіх потоків зводяться в один .pstats; порожні профілі не записуються
+    stats = None
+    for profile in session.profiles.values():
+        profile.create_stats()
+        if profile.stats:
+            stats = pstats.Stats(profile) if stats is None else stats.add(profile)
+    if stats is not None:
+        path = profiles_path / f"{name}.pstats"
+        stats.dump_stats(path)
+        outputs['pstats'] = str(path)
+    if 'cprofile' in _MODES:
+        if session.profile_skipped:
+            print(f"Warning: cProfile skipped {session.profile_skipped} call(s) of '{name}': "
+                  f"another profiler was already active in this interpreter")
+        if stats is None and session.calls:
+            print(f"Warning: cProfile recorded none of the profiled calls of '{name}'; .pstats was not written")
+
+    if session.stacks:
+        path = profiles_path / f"{name}.collapsed"
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(session.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        outputs['collapsed'] = str(path)
+
+    if 'tracemalloc' in _MODES and tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        path = profiles_path / f"{name}.tracemalloc"
+        snapshot.dump(str(path))
+        outputs['tracemalloc'] = str(path)
+        current, peak = tracemalloc.get_traced_memory()
+        summary['tracemalloc'] = {
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top': [
+                {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:20]
+            ],
+        }
+
+    path = profiles_path / f"{name}_calls.json"
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    outputs['calls'] = str(path)
+    return outputs
+
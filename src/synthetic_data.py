@@ -0,0 +1,238 @@
+"""
+Модуль для генерації синтетичних даних у схемі WHO Life Expectancy
+Відтворює стовпці, розподіли, кореляції, структуру країна/рік та пропуски
+реального датасету у масштабі від 1× (~2.9 тис. рядків) до 1000× і більше
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+YEARS = tuple(range(2000, 2016))
+
+# Країн у реальному датасеті; масштаб множить кількість країн, роки лишаються 2000-2015
+BASE_COUNTRIES = 193
+
+# Частка країн лише з одним роком спостережень (у реальних даних - 2013 рік без target)
+SINGLE_YEAR_SHARE = 0.05
+SINGLE_YEAR = 2013
+
+# Статус Developed мають ~17% країн: поріг рівня розвитку - квантиль N(0, 1) рівня 0.83
+DEVELOPED_THRESHOLD = 0.954
+
+# Параметри стовпців: (розподіл, середнє, std, навантаження на рівень розвитку, межі, частка пропусків).
+# Середні, std, межі та частки пропусків - як у реальному датасеті; навантаження підібрані так,
+# щоб кореляції з 'Life expectancy ' після перетворення розподілів відповідали реальним.
+# Розподіли: normal - нормальний з обрізанням до меж; lognormal - важкі хвости (GDP, Population);
+# coverage - відсоткове охоплення з лівим хвостом (вакцинація)
+COLUMN_SPECS: Dict[str, Tuple[str, float, float, float, Tuple[float, float], float]] = {
+    'Life expectancy ': ('normal', 69.2, 9.5, 0.95, (36.3, 89.0), 0.003),
+    'Adult Mortality': ('lognormal', 164.8, 124.3, -0.80, (1.0, 723.0), 0.003),
+    'infant deaths': ('lognormal', 30.3, 117.9, -0.38, (0.0, 1800.0), 0.0),
+    'Alcohol': ('normal', 4.6, 4.05, 0.44, (0.01, 17.9), 0.066),
+    'percentage expenditure': ('lognormal', 738.3, 1987.9, 0.65, (0.0, 19480.0), 0.0),
+    'Hepatitis B': ('coverage', 80.9, 25.1, 0.31, (1.0, 99.0), 0.188),
+    'Measles ': ('lognormal', 2419.6, 11467.3, -0.34, (0.0, 212183.0), 0.0),
+    ' BMI ': ('normal', 38.3, 20.0, 0.60, (1.0, 87.3), 0.012),
+    'under-five deaths ': ('lognormal', 42.0, 160.4, -0.43, (0.0, 2500.0), 0.0),
+    'Polio': ('coverage', 82.5, 23.4, 0.57, (3.0, 99.0), 0.006),
+    'Total expenditure': ('normal', 5.94, 2.5, 0.23, (0.37, 17.6), 0.077),
+    'Diphtheria ': ('coverage', 82.3, 23.7, 0.58, (2.0, 99.0), 0.006),
+    ' HIV/AIDS': ('lognormal', 1.74, 5.08, -0.93, (0.1, 50.6), 0.0),
+    'GDP': ('lognormal', 7483.2, 14270.2, 0.69, (1.68, 119172.7), 0.152),
+    'Population': ('lognormal', 1.28e7, 6.1e7, -0.05, (34.0, 1.29e9), 0.222),
+    ' thinness  1-19 years': ('lognormal', 4.84, 4.42, -0.57, (0.1, 27.7), 0.012),
+    ' thinness 5-9 years': ('lognormal', 4.87, 4.51, -0.56, (0.1, 28.6), 0.012),
+    'Income composition of resources': ('normal', 0.628, 0.21, 0.77, (0.0, 0.948), 0.057),
+    'Schooling': ('normal', 11.99, 3.36, 0.79, (0.0, 20.7), 0.055),
+}
+
+# Стовпці з цілими значеннями без пропусків
+INTEGER_COLUMNS = ('infant deaths', 'Measles ', 'under-five deaths ')
+
+# Частка пропусків, що припадає на країни без даних за всі роки (решта - окремі рядки)
+COUNTRY_LEVEL_MISSING_SHARE = 0.6
+
+COLUMNS = ['Country', 'Year', 'Status', *COLUMN_SPECS]
+
+
+def _lognormal_params(mean: float, std: float) -> Tuple[float, float]:
+    """
+    Параметри mu/sigma логнормального розподілу із заданими середнім і std
+    """
+    sigma2 = np.log1p((std / mean) ** 2)
+    return np.log(mean) - sigma2 / 2, np.sqrt(sigma2)
+
+
+def _to_marginal(z: np.ndarray, kind: str, mean: float, std: float, bounds: Tuple[float, float]) -> np.ndarray:
+    """
+    Перетворює стандартні нормальні значення у потрібний маргінальний розподіл
+    """
+    if kind == 'lognormal':
+        mu, sigma = _lognormal_params(mean, std)
+        values = np.exp(mu + sigma * z)
+    elif kind == 'coverage':
+        # Охоплення з верхньою межею: лівий хвіст через логнормальне "недоохоплення"
+        mu, sigma = _lognormal_params(100.0 - mean, std)
+        values = 100.0 - np.exp(mu - sigma * z)
+    else:
+        values = mean + std * z
+    return np.clip(values, *bounds)
+
+
+def _country_chunk(rng: np.random.Generator, first_country: int, n_countries: int) -> pd.DataFrame:
+    """
+    Генерує рядки для n_countries країн, починаючи з номера first_country
+    """
+    n_years = len(YEARS)
+    # Латентний рівень розвитку: сталий для країни + тренд за роками + шум рядка
+    development = rng.standard_normal(n_countries)
+    single_year = rng.random(n_countries) < SINGLE_YEAR_SHARE
+
+    country_idx = np.repeat(np.arange(n_countries), n_years)
+    years = np.tile(np.array(YEARS), n_countries)
+    keep = ~single_year[country_idx] | (years == SINGLE_YEAR)
+    country_idx, years = country_idx[keep], years[keep]
+    n_rows = len(country_idx)
+
+    trend = (years - YEARS[0]) / (n_years - 1) - 0.5
+    latent = 0.92 * development[country_idx] + 0.3 * trend + 0.25 * rng.standard_normal(n_rows)
+    latent /= np.sqrt(0.92 ** 2 + 0.3 ** 2 / 12 + 0.25 ** 2)
+
+    data = {
+        'Country': np.array([f"Country {first_country + i:06d}" for i in range(n_countries)])[country_idx],
+        'Year': years.astype(np.int64),
+        'Status': np.where(development[country_idx] > DEVELOPED_THRESHOLD, 'Developed', 'Developing'),
+    }
+
+    # Однофакторна гаусова копула: кореляція двох стовпців ≈ добутку їхніх навантажень
+    for column, (kind, mean, std, loading, bounds, missing_rate) in COLUMN_SPECS.items():
+        noise = rng.standard_normal(n_rows)
+        z = loading * latent + np.sqrt(1 - loading ** 2) * noise
+        values = _to_marginal(z, kind, mean, std, bounds)
+
+        if missing_rate > 0:
+            country_missing = rng.random(n_countries) < missing_rate * COUNTRY_LEVEL_MISSING_SHARE
+            row_missing = rng.random(n_rows) < missing_rate * (1 - COUNTRY_LEVEL_MISSING_SHARE)
+            values[country_missing[country_idx] | row_missing] = np.nan
+        data[column] = values
+
+    # Смертність до 5 років майже пропорційна дитячій (кореляція ~0.99 у реальних даних)
+    data['under-five deaths '] = data['infant deaths'] * rng.uniform(1.2, 1.6, n_rows)
+    for column in INTEGER_COLUMNS:
+        data[column] = np.round(data[column]).astype(np.int64)
+    # У країнах з одним роком спостережень target і смертність відсутні
+    for column in ('Life expectancy ', 'Adult Mortality'):
+        data[column][single_year[country_idx]] = np.nan
+
+    return pd.DataFrame(data, columns=COLUMNS)
+
+
+def iter_synthetic_chunks(scale: float = 1.0,
+                          random_state: int = 42,
+                          chunk_countries: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Генерує синтетичний датасет частинами по chunk_countries країн
+
+    Результат детермінований для однакових scale, random_state і chunk_countries
+
+    Args:
+        scale: масштаб відносно реального датасету (1.0 ≈ 2.9 тис. рядків)
+        random_state: seed генератора
+        chunk_countries: кількість країн в одній частині (обмежує пам'ять)
+
+    Yields:
+        pd.DataFrame: частина датасету
+    """
+    n_countries = max(int(round(BASE_COUNTRIES * scale)), 1)
+    seeds = np.random.SeedSequence(random_state)
+    for first in range(0, n_countries, chunk_countries):
+        rng = np.random.default_rng(seeds.spawn(1)[0])
+        yield _country_chunk(rng, first, min(chunk_countries, n_countries - first))
+
+
+def generate_life_expectancy_data(scale: float = 1.0,
+                                  random_state: int = 42,
+                                  chunk_countries: int = 5000) -> pd.DataFrame:
+    """
+    Генерує синтетичний датасет у схемі WHO Life Expectancy
+
+    Args:
+        scale: масштаб відносно реального датасету (1.0 ≈ 2.9 тис. рядків, 1000 ≈ 2.9 млн)
+        random_state: seed генератора
+        chunk_countries: кількість країн в одній частині генерації
+
+    Returns:
+        pd.DataFrame: дані з тими ж стовпцями, що й реальний CSV
+    """
+    return pd.concat(list(iter_synthetic_chunks(scale, random_state, chunk_countries)), ignore_index=True)
+
+
+def write_synthetic_csv(path, scale: float = 1.0,
+                        random_state: int = 42,
+                        chunk_countries: int = 5000) -> Path:
+    """
+    Записує синтетичний датасет у CSV частинами, не тримаючи його в пам'яті цілком
+
+    Args:
+        path: шлях до CSV файлу
+        scale: масштаб відносно реального датасету
+        random_state: seed генератора
+        chunk_countries: кількість країн в одній частині
+
+    Returns:
+        Path: шлях до записаного файлу
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for i, chunk in enumerate(iter_synthetic_chunks(scale, random_state, chunk_countries)):
+            chunk.to_csv(f, index=False, header=i == 0)
+    tmp_path.replace(path)
+    return path
+
+
+def describe_shape(df: pd.DataFrame, target: str = 'Life expectancy ') -> Dict:
+    """
+    Короткий опис "форми" датасету для порівняння синтетичних і реальних даних
+
+    Args:
+        df: DataFrame
+        target: цільова змінна
+
+    Returns:
+        Dict: кількість рядків/країн, частки пропусків і кореляції з target
+    """
+    numeric = df.select_dtypes(include=[np.number]).drop(columns=['Year'], errors='ignore')
+    return {
+        'rows': int(len(df)),
+        'countries': int(df['Country'].nunique()) if 'Country' in df.columns else None,
+        'missing_share': {col: round(float(share), 4) for col, share in df.isna().mean().items()},
+        'target_correlation': {
+            col: round(float(value), 3)
+            for col, value in numeric.corrwith(numeric[target]).drop(target).items()
+        } if target in numeric.columns else {},
+    }
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description='Генерація синтетичного датасету WHO Life Expectancy')
+    parser.add_argument('--scale', type=float, default=1.0, help='масштаб відносно реального датасету')
+    parser.add_argument('--seed', type=int, default=42, help='seed генератора')
+    parser.add_argument('--output', default=None, help='шлях до CSV (за замовчуванням data/raw/...)')
+    args = parser.parse_args(argv)
+
+    output = Path(args.output) if args.output else (
+        Path(__file__).parent.parent / 'data' / 'raw' / f"Life Expectancy Data x{args.scale:g}.csv"
+    )
+    path = write_synthetic_csv(output, scale=args.scale, random_state=args.seed)
+    print(f"✓ Синтетичний датасет (масштаб {args.scale:g}×) збережено: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,40 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import time
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict
+from typing import List, NamedTuple, Optional, Tuple, Dict
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from src.cache import dataframe_fingerprint, params_fingerprint
+    from src.chart_data import (bin_xy, binned_trend, compute_distribution_summaries,
+                                compute_distribution_summary, correlation_chart, distribution_chart,
+                                distributions_chart, get_charts_path, grouped_comparison_chart,
+                                missing_values_chart, reservoir_sample_indices, write_chart_data)
+    from src.correlation import correlation_with_target, get_correlation_matrix
+    from src.profiling import profiled
+except ImportError:  # запуск як скрипта або з notebooks (src у sys.path)
+    from cache import dataframe_fingerprint, params_fingerprint
+    from chart_data import (bin_xy, binned_trend, compute_distribution_summaries,
+                            compute_distribution_summary, correlation_chart, distribution_chart,
+                            distributions_chart, get_charts_path, grouped_comparison_chart,
+                            missing_values_chart, reservoir_sample_indices, write_chart_data)
+    from correlation import correlation_with_target, get_correlation_matrix
+    from profiling import profiled
+
+
+# Версія коду рендерингу: збільшується, коли змінюється вигляд графіків
+_RENDER_CACHE_VERSION = 2
+
+# Лічильники кешу графіків у поточному процесі
+_RENDER_CACHE_STATS = {'hits': 0, 'misses': 0}
+
+# Зменшені версії графіків для веб-інтерфейсу: назва -> (підпапка, ширина в пікселях)
+FIGURE_RENDITIONS = {'thumb': ('thumbs', 480), 'screen': ('screen', 1600)}
+FIGURES_MANIFEST_NAME = 'figures_manifest.json'
+
 
 def setup_plot_style(style: str = 'seaborn-v0_8'):
     """
@@ -62,6 +91,210 @@ def get_figures_path() -> Path:
     return figures_dir
 
 
+def _render_cache_enabled() -> bool:
+    """
+    Кеш графіків працює лише для збереження без показу на екрані
+    і вимикається змінною середовища FIGURE_CACHE=0.
+    """
+    enabled = os.getenv("FIGURE_CACHE", "1").strip().lower() not in {"0", "false", "no"}
+    return enabled and not _should_show_plots()
+
+
+def _render_cache_key(plot: str, data, **params) -> str:
+    """
+    Fingerprint графіка: дані, що відображаються, параметри функції та стиль
+    """
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    data_key = dataframe_fingerprint(data) if isinstance(data, pd.DataFrame) else params_fingerprint(data)
+    style_key = params_fingerprint(
+        {key: str(value) for key, value in plt.rcParams.items()},
+        [list(color) for color in sns.color_palette()],
+    )
+    return params_fingerprint(_RENDER_CACHE_VERSION, plot, data_key, params, style_key)
+
+
+def _render_cache_meta_path(filename: str) -> Path:
+    return get_figures_path() / '.cache' / f'{filename}.json'
+
+
+def _renditions_enabled() -> bool:
+    """
+    Зменшені копії графіків для веб-інтерфейсу (вимикаються FIGURE_RENDITIONS=0)
+    """
+    return os.getenv("FIGURE_RENDITIONS", "1").strip().lower() not in {"0", "false", "no"}
+
+
+def _save_renditions(filename: str) -> Dict[str, Dict]:
+    """
+    Створює зменшені копії збереженого PNG у форматі WebP
+    (мініатюра та версія для екрана) у підпапках папки графіків
+
+    Args:
+        filename: назва PNG-файлу в папці графіків
+
+    Returns:
+        Словник rendition -> {path, width, height, bytes}; 'original' - сам PNG
+    """
+    from PIL import Image
+
+    figures_dir = get_figures_path()
+    source = figures_dir / filename
+    with Image.open(source) as image:
+        image.load()
+        renditions = {
+            'original': {'path': filename, 'width': image.width, 'height': image.height,
+                         'bytes': source.stat().st_size},
+        }
+        if not _renditions_enabled():
+            return renditions
+
+        for name, (subdir, width) in FIGURE_RENDITIONS.items():
+            scaled = image.copy()
+            scaled.thumbnail((width, width * 10), Image.LANCZOS)
+            relative = Path(subdir) / f'{Path(filename).stem}.webp'
+            target = figures_dir / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            scaled.save(target, format='WEBP', quality=80, method=4)
+            renditions[name] = {'path': relative.as_posix(), 'width': scaled.width,
+                                'height': scaled.height, 'bytes': target.stat().st_size}
+    return renditions
+
+
+def _renditions_complete(renditions: Dict[str, Dict]) -> bool:
+    if not _renditions_enabled():
+        return 'original' in renditions
+    figures_dir = get_figures_path()
+    return all(
+        name in renditions and (figures_dir / renditions[name]['path']).exists()
+        for name in ('original', *FIGURE_RENDITIONS)
+    )
+
+
+def _write_figure_meta(filename: str, cache_key: str, renditions: Dict[str, Dict]) -> None:
+    import json
+
+    meta_path = _render_cache_meta_path(filename)
+    meta_path.parent.mkdir(parents=True, exist_ok=True)
+    with meta_path.open('w', encoding='utf-8') as f:
+        json.dump({'key': cache_key, 'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'renditions': renditions}, f)
+
+
+def _reuse_cached_figure(filename: str, cache_key: str) -> bool:
+    """
+    Перевіряє, чи збережений графік відповідає fingerprint (тоді рендеринг не потрібен).
+    Відсутні зменшені копії створюються з наявного PNG без повторного рендерингу.
+    """
+    if not _render_cache_enabled():
+        return False
+
+    import json
+
+    filepath = get_figures_path() / filename
+    meta_path = _render_cache_meta_path(filename)
+    try:
+        with meta_path.open('r', encoding='utf-8') as f:
+            meta = json.load(f)
+        hit = filepath.exists() and meta.get('key') == cache_key
+    except (OSError, ValueError):
+        hit = False
+
+    _RENDER_CACHE_STATS['hits' if hit else 'misses'] += 1
+    if hit:
+        if not _renditions_complete(meta.get('renditions', {})):
+            _write_figure_meta(filename, cache_key, _save_renditions(filename))
+        print(f"✓ Використано кеш: {filepath}")
+    return hit
+
+
+def _save_figure(fig, filename: str, cache_key: str) -> Path:
+    """
+    Зберігає графік (PNG 300 dpi та зменшені копії) і записує його fingerprint для кешу
+    """
+    filepath = get_figures_path() / filename
+    fig.savefig(filepath, dpi=300, bbox_inches='tight')
+    print(f"✓ Збережено: {filepath}")
+
+    _write_figure_meta(filename, cache_key, _save_renditions(filename))
+    return filepath
+
+
+def write_figures_manifest() -> Dict:
+    """
+    Маніфест усіх збережених графіків з їхніми версіями (для веб-інтерфейсу).
+    Записується атомарно, щоб веб-сервіс не прочитав частковий файл.
+
+    Returns:
+        Словник маніфесту: generated_at, figures (назва -> renditions)
+    """
+    import json
+
+    figures_dir = get_figures_path()
+    figures = {}
+    for meta_path in sorted((figures_dir / '.cache').glob('*.json')):
+        filename = meta_path.name[:-len('.json')]
+        if not (figures_dir / filename).exists():
+            continue
+        try:
+            with meta_path.open('r', encoding='utf-8') as f:
+                renditions = json.load(f).get('renditions')
+        except (OSError, ValueError):
+            continue
+        if renditions:
+            figures[filename] = renditions
+
+    manifest = {'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'figures': figures}
+    manifest_path = figures_dir / FIGURES_MANIFEST_NAME
+    tmp_path = manifest_path.with_name(f'.{manifest_path.name}.tmp')
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def _density_threshold(value: Optional[int] = None) -> int:
+    """
+    Поріг кількості точок, вище якого scatter замінюється графіком густини
+    (параметр функції або змінна середовища DENSITY_PLOT_THRESHOLD)
+    """
+    if value is not None:
+        return value
+    return int(os.getenv("DENSITY_PLOT_THRESHOLD", "50000"))
+
+
+def _draw_points(ax, x: np.ndarray, y: np.ndarray, density: bool,
+                 sample_size: int = 2000, bins: int = 150, colorbar: bool = True) -> None:
+    """
+    Малює точки: звичайний scatter або густину (2D-гістограма на NumPy)
+    з рівномірною вибіркою точок поверх
+    """
+    if not density:
+        ax.scatter(x, y, alpha=0.5, s=50)
+        return
+
+    from matplotlib.colors import LogNorm
+
+    hist = bin_xy(x, y, bins=bins)
+    counts = np.ma.masked_equal(hist['counts'].T, 0)
+    mesh = ax.pcolormesh(hist['x_edges'], hist['y_edges'], counts,
+                         cmap='viridis', norm=LogNorm(), shading='flat')
+    if colorbar:
+        ax.figure.colorbar(mesh, ax=ax, label='Кількість точок')
+
+    if sample_size > 0:
+        idx = reservoir_sample_indices(len(x), sample_size)
+        ax.scatter(x[idx], y[idx], s=4, alpha=0.3, color='white', edgecolors='none')
+
+
+def get_render_cache_stats() -> Dict[str, int]:
+    """
+    Повертає кількість влучань і промахів кешу графіків у поточному процесі
+    """
+    return dict(_RENDER_CACHE_STATS)
+
+
+@profiled
 def plot_missing_values(df: pd.DataFrame, 
                        save: bool = False,
                        filename: str = 'missing_values.png') -> None:
@@ -82,6 +315,10 @@ def plot_missing_values(df: pd.DataFrame,
     
     missing_pct = (missing / len(df) * 100).round(2)
     
+    cache_key = _render_cache_key('plot_missing_values', missing_pct)
+    if save and _reuse_cached_figure(filename, cache_key):
+        return
+    
     fig, ax = plt.subplots(figsize=(10, max(6, len(missing) * 0.3)))
     bars = ax.barh(range(len(missing)), missing_pct.values)
     
@@ -104,20 +341,21 @@ def plot_missing_values(df: pd.DataFrame,
     plt.tight_layout()
     
     if save:
-        filepath = get_figures_path() / filename
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, filename, cache_key)
 
     _finalize_plot(fig)
 
 
+@profiled
 def plot_distribution(df: pd.DataFrame, 
                      column: str,
                      bins: int = 30,
                      save: bool = False,
                      filename: str = None) -> None:
     """
-    Візуалізація розподілу змінної
+    Візуалізація розподілу змінної.
+    Гістограма, box plot і KDE малюються з одного підсумку compute_distribution_summary,
+    тому час побудови майже не залежить від кількості значень.
     
     Args:
         df: DataFrame
@@ -130,15 +368,25 @@ def plot_distribution(df: pd.DataFrame,
         raise ValueError(f"Column '{column}' not found")
     
     data = df[column].dropna()
+    fname = filename or f'distribution_{column.replace(" ", "_")}.png'
+    
+    cache_key = _render_cache_key('plot_distribution', data, column=column, bins=bins)
+    if save and _reuse_cached_figure(fname, cache_key):
+        return
+    
+    # Один підсумок даних для всіх трьох панелей
+    summary = compute_distribution_summary(data.to_numpy(), bins=bins)
+    hist = summary['histogram']
     
     fig, axes = plt.subplots(1, 3, figsize=(18, 5))
     
     # Гістограма
-    axes[0].hist(data, bins=bins, edgecolor='black', alpha=0.7)
-    axes[0].axvline(data.mean(), color='red', linestyle='--', 
-                    linewidth=2, label=f'Mean: {data.mean():.2f}')
-    axes[0].axvline(data.median(), color='green', linestyle='--', 
-                    linewidth=2, label=f'Median: {data.median():.2f}')
+    axes[0].hist(hist['edges'][:-1], bins=hist['edges'], weights=hist['counts'],
+                 edgecolor='black', alpha=0.7)
+    axes[0].axvline(summary['mean'], color='red', linestyle='--', 
+                    linewidth=2, label=f'Mean: {summary["mean"]:.2f}')
+    axes[0].axvline(summary['median'], color='green', linestyle='--', 
+                    linewidth=2, label=f'Median: {summary["median"]:.2f}')
     axes[0].set_xlabel(column)
     axes[0].set_ylabel('Frequency')
     axes[0].set_title('Histogram')
@@ -146,13 +394,13 @@ def plot_distribution(df: pd.DataFrame,
     axes[0].grid(alpha=0.3)
     
     # Box plot
-    axes[1].boxplot(data, vert=True)
+    axes[1].bxp([summary['box']], vert=True)
     axes[1].set_ylabel(column)
     axes[1].set_title('Box Plot')
     axes[1].grid(alpha=0.3)
     
     # KDE plot
-    data.plot(kind='kde', ax=axes[2], linewidth=2)
+    axes[2].plot(summary['kde']['x'], summary['kde']['density'], linewidth=2)
     axes[2].set_xlabel(column)
     axes[2].set_ylabel('Density')
     axes[2].set_title('Kernel Density Estimate')
@@ -162,18 +410,215 @@ def plot_distribution(df: pd.DataFrame,
     plt.tight_layout()
     
     if save:
-        fname = filename or f'distribution_{column.replace(" ", "_")}.png'
-        filepath = get_figures_path() / fname
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, fname, cache_key)
 
     _finalize_plot(fig)
 
 
+def _page_filename(filename: str, page: int) -> str:
+    """
+    Назва файлу сторінки: перша сторінка - сам filename, далі <stem>_p<N><suffix>
+    """
+    if page == 0:
+        return filename
+    path = Path(filename)
+    return f'{path.stem}_p{page + 1}{path.suffix}'
+
+
+def _remove_figure(filename: str) -> None:
+    """
+    Видаляє збережений графік разом зі зменшеними копіями та записом кешу
+    """
+    figures_dir = get_figures_path()
+    paths = [figures_dir / filename, _render_cache_meta_path(filename)]
+    paths += [figures_dir / subdir / f'{Path(filename).stem}.webp' for subdir, _ in FIGURE_RENDITIONS.values()]
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def _remove_stale_pages(filename: str, pages_count: int) -> None:
+    """
+    Видаляє сторінки <stem>_p<N><suffix> з попередніх запусків, яких тепер немає
+    """
+    path = Path(filename)
+    prefix = f'{path.stem}_p'
+    for page_path in get_figures_path().glob(f'{prefix}*{path.suffix}'):
+        number = page_path.name[len(prefix):-len(path.suffix) or None]
+        if number.isdigit() and int(number) > pages_count:
+            _remove_figure(page_path.name)
+
+
+def _plot_pages(items: List[str], draw, plot: str, data: pd.DataFrame, filename: str,
+                ncols: int, rows_per_page: int, save: bool,
+                key_columns: Optional[List[str]] = None, **params) -> None:
+    """
+    Сторінки сітки малих графіків з одним об'єктом figure на всі сторінки:
+    осі очищаються й перемальовуються, а не створюються заново.
+
+    Args:
+        items: підписи панелей (по одному на subplot)
+        draw: функція draw(ax, item) для однієї панелі
+        plot: назва функції графіка (для ключа кешу)
+        data: дані, що відображаються (для ключа кешу сторінки)
+        filename: назва файлу першої сторінки
+        ncols: кількість стовпців сітки
+        rows_per_page: кількість рядків сітки на сторінці
+        save: чи зберігати графіки
+        key_columns: стовпці, спільні для всіх панелей (додаються до ключа кешу)
+        **params: параметри для ключа кешу
+    """
+    per_page = ncols * rows_per_page
+    pages = [items[i:i + per_page] for i in range(0, len(items), per_page)]
+    fig = axes = None
+    if save:
+        _remove_stale_pages(filename, len(pages))
+
+    for page, page_items in enumerate(pages):
+        fname = _page_filename(filename, page)
+        cache_key = _render_cache_key(plot, data[page_items + (key_columns or [])], page=page, ncols=ncols,
+                                      rows_per_page=rows_per_page, **params)
+        if save and _reuse_cached_figure(fname, cache_key):
+            continue
+
+        nrows = rows_per_page if len(pages) > 1 else -(-len(page_items) // ncols)
+        if fig is None or axes.shape[0] != nrows:
+            if fig is not None:
+                plt.close(fig)
+            fig, axes = plt.subplots(nrows, ncols, figsize=(4.5 * ncols, 3.5 * nrows), squeeze=False)
+
+        for ax, item in zip(axes.flat, page_items + [None] * (axes.size - len(page_items))):
+            ax.clear()
+            ax.set_visible(item is not None)
+            if item is not None:
+                draw(ax, item)
+
+        fig.tight_layout()
+        if save:
+            _save_figure(fig, fname, cache_key)
+        if _should_show_plots():
+            plt.show()
+            fig = axes = None
+
+    if fig is not None:
+        plt.close(fig)
+
+
+@profiled
+def plot_distributions(df: pd.DataFrame,
+                       columns: Optional[List[str]] = None,
+                       bins: int = 30,
+                       ncols: int = 4,
+                       rows_per_page: int = 3,
+                       save: bool = False,
+                       filename: str = 'distributions.png') -> None:
+    """
+    Розподіли багатьох змінних у вигляді сітки малих графіків (гістограма з KDE).
+    Підсумки всіх стовпців обчислюються разом (compute_distribution_summaries),
+    сторінки малюються на одному об'єкті figure.
+    
+    Args:
+        df: DataFrame
+        columns: список стовпців (за замовчуванням усі числові)
+        bins: кількість bins для гістограм
+        ncols: кількість графіків у рядку
+        rows_per_page: кількість рядків на сторінці
+        save: чи зберігати графіки
+        filename: назва файлу першої сторінки (наступні - <назва>_p2.png, ...)
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Columns not found: {', '.join(missing)}")
+    
+    summaries = compute_distribution_summaries(df, columns, bins=bins)
+    
+    def draw(ax, column):
+        summary = summaries[column]
+        hist = summary['histogram']
+        ax.hist(hist['edges'][:-1], bins=hist['edges'], weights=hist['counts'],
+                edgecolor='black', alpha=0.7)
+        # KDE у масштабі частот гістограми
+        bin_width = hist['edges'][1] - hist['edges'][0]
+        ax.plot(summary['kde']['x'], np.asarray(summary['kde']['density']) * summary['count'] * bin_width,
+                color='darkblue', linewidth=1.5)
+        ax.set_xlim(hist['edges'][0], hist['edges'][-1])
+        ax.axvline(summary['median'], color='green', linestyle='--', linewidth=1.5)
+        ax.set_title(f'{column.strip()} (n={summary["count"]})', fontsize=10)
+        ax.grid(alpha=0.3)
+    
+    _plot_pages([col for col in columns if col in summaries], draw, 'plot_distributions', df,
+                filename, ncols, rows_per_page, save, bins=bins)
+
+
+@profiled
+def plot_scatter_matrix(df: pd.DataFrame,
+                        target: str = 'Life expectancy ',
+                        columns: Optional[List[str]] = None,
+                        ncols: int = 4,
+                        rows_per_page: int = 3,
+                        save: bool = False,
+                        filename: str = 'scatter_matrix.png',
+                        density_threshold: Optional[int] = None,
+                        sample_size: int = 2000) -> None:
+    """
+    Залежність цільової змінної від кожної ознаки у вигляді сітки малих графіків.
+    Дані копіюються в одну float-матрицю, кореляції з target обчислюються
+    одним векторизованим проходом; великі вибірки малюються як густина.
+    
+    Args:
+        df: DataFrame
+        target: цільова змінна (вісь Y)
+        columns: ознаки (за замовчуванням усі числові; target у списку ігнорується)
+        ncols: кількість графіків у рядку
+        rows_per_page: кількість рядків на сторінці
+        save: чи зберігати графіки
+        filename: назва файлу першої сторінки (наступні - <назва>_p2.png, ...)
+        density_threshold: поріг кількості точок (за замовчуванням DENSITY_PLOT_THRESHOLD)
+        sample_size: кількість точок поверх графіка густини (0 - без точок)
+    """
+    if target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found")
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    # target лише на осі Y, а не окремою панеллю
+    columns = [col for col in columns if col != target]
+    
+    values = df[columns].to_numpy(dtype=float)
+    y = df[target].to_numpy(dtype=float)
+    positions = {col: j for j, col in enumerate(columns)}
+    correlations = correlation_with_target(df[columns + [target]], target=target)
+    threshold = _density_threshold(density_threshold)
+    
+    def draw(ax, column):
+        x = values[:, positions[column]]
+        mask = np.isfinite(x) & np.isfinite(y)
+        x_valid, y_valid = x[mask], y[mask]
+        if len(x_valid) < 2:
+            ax.set_title(f'{column.strip()} (немає даних)', fontsize=10)
+            return
+        
+        density = len(x_valid) > threshold
+        _draw_points(ax, x_valid, y_valid, density, sample_size=sample_size, colorbar=False)
+        if x_valid.min() < x_valid.max():
+            z = binned_trend(x_valid, y_valid)['coefficients'] if density else np.polyfit(x_valid, y_valid, 1)
+            x_line = np.array([x_valid.min(), x_valid.max()])
+            ax.plot(x_line, np.poly1d(z)(x_line), 'r--', linewidth=1.5)
+        
+        ax.set_title(f'{column.strip()} (r={correlations[column]:.2f})', fontsize=10)
+        ax.set_ylabel(target.strip(), fontsize=8)
+        ax.grid(alpha=0.3)
+    
+    _plot_pages(list(columns), draw, 'plot_scatter_matrix', df, filename, ncols, rows_per_page, save,
+                key_columns=[target], density_threshold=threshold, sample_size=sample_size)
+
+
+@profiled
 def plot_correlation_matrix(df: pd.DataFrame,
                            figsize: Tuple[int, int] = (14, 12),
                            save: bool = False,
-                           filename: str = 'correlation_matrix.png') -> None:
+                           filename: str = 'correlation_matrix.png',
+                           method: str = 'pearson') -> None:
     """
     Візуалізація матриці кореляції
     
@@ -182,9 +627,14 @@ def plot_correlation_matrix(df: pd.DataFrame,
         figsize: розмір графіка
         save: чи зберігати графік
         filename: назва файлу
+        method: 'pearson' або 'spearman'
     """
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    corr_matrix = df[numeric_cols].corr()
+    corr_matrix = get_correlation_matrix(df, method=method)
+    
+    cache_key = _render_cache_key('plot_correlation_matrix', corr_matrix,
+                                  figsize=list(figsize), method=method)
+    if save and _reuse_cached_figure(filename, cache_key):
+        return
     
     fig, ax = plt.subplots(figsize=figsize)
     sns.heatmap(corr_matrix, annot=False, cmap='coolwarm', center=0,
@@ -194,20 +644,23 @@ def plot_correlation_matrix(df: pd.DataFrame,
     plt.tight_layout()
     
     if save:
-        filepath = get_figures_path() / filename
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, filename, cache_key)
 
     _finalize_plot(fig)
 
 
+@profiled
 def plot_scatter_with_regression(df: pd.DataFrame,
                                  x_col: str,
                                  y_col: str,
                                  save: bool = False,
-                                 filename: str = None) -> None:
+                                 filename: str = None,
+                                 density_threshold: Optional[int] = None,
+                                 sample_size: int = 2000) -> None:
     """
-    Scatter plot з лінією регресії
+    Scatter plot з лінією регресії.
+    Якщо точок більше за density_threshold, малюється густина точок
+    з вибіркою поверх, а тренд підганяється за середніми в бінах.
     
     Args:
         df: DataFrame
@@ -215,16 +668,31 @@ def plot_scatter_with_regression(df: pd.DataFrame,
         y_col: назва стовпця для осі Y
         save: чи зберігати графік
         filename: назва файлу
+        density_threshold: поріг кількості точок (за замовчуванням DENSITY_PLOT_THRESHOLD)
+        sample_size: кількість точок поверх графіка густини (0 - без точок)
     """
-    data = df[[x_col, y_col]].dropna()
+    # Лише скінченні значення: ±inf ламають межі бінів у режимі густини
+    data = df[[x_col, y_col]]
+    data = data[np.isfinite(data.to_numpy(dtype=float)).all(axis=1)]
+    fname = filename or f'scatter_{x_col}_{y_col}'.replace(' ', '_') + '.png'
+    density = len(data) > _density_threshold(density_threshold)
+    
+    cache_key = _render_cache_key('plot_scatter_with_regression', data, x_col=x_col, y_col=y_col,
+                                  density=density, sample_size=sample_size)
+    if save and _reuse_cached_figure(fname, cache_key):
+        return
+    
+    x = data[x_col].to_numpy(dtype=float)
+    y = data[y_col].to_numpy(dtype=float)
     
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(data[x_col], data[y_col], alpha=0.5, s=50)
+    _draw_points(ax, x, y, density, sample_size=sample_size)
     
     # Лінія тренду
-    z = np.polyfit(data[x_col], data[y_col], 1)
+    z = binned_trend(x, y)['coefficients'] if density else np.polyfit(x, y, 1)
     p = np.poly1d(z)
-    ax.plot(data[x_col], p(data[x_col]), "r--", alpha=0.8, 
+    x_line = np.array([x.min(), x.max()])
+    ax.plot(x_line, p(x_line), "r--", alpha=0.8, 
             linewidth=2, label='Trend line')
     
     # Кореляція
@@ -242,14 +710,12 @@ def plot_scatter_with_regression(df: pd.DataFrame,
     plt.tight_layout()
     
     if save:
-        fname = filename or f'scatter_{x_col}_{y_col}'.replace(' ', '_') + '.png'
-        filepath = get_figures_path() / fname
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, fname, cache_key)
 
     _finalize_plot(fig)
 
 
+@profiled
 def plot_feature_importance(importance_dict: Dict[str, float],
                            top_n: int = 15,
                            save: bool = False,
@@ -270,6 +736,10 @@ def plot_feature_importance(importance_dict: Dict[str, float],
     
     features, importance = zip(*sorted_features)
     
+    cache_key = _render_cache_key('plot_feature_importance', sorted_features, top_n=top_n)
+    if save and _reuse_cached_figure(filename, cache_key):
+        return
+    
     fig, ax = plt.subplots(figsize=(10, max(6, top_n * 0.4)))
     bars = ax.barh(range(len(features)), importance)
     
@@ -293,20 +763,22 @@ def plot_feature_importance(importance_dict: Dict[str, float],
     plt.tight_layout()
     
     if save:
-        filepath = get_figures_path() / filename
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, filename, cache_key)
 
     _finalize_plot(fig)
 
 
+@profiled
 def plot_model_predictions(y_true: np.ndarray,
                           y_pred: np.ndarray,
                           title: str = 'Model Predictions',
                           save: bool = False,
-                          filename: str = 'model_predictions.png') -> None:
+                          filename: str = 'model_predictions.png',
+                          density_threshold: Optional[int] = None,
+                          sample_size: int = 2000) -> None:
     """
-    Візуалізація фактичних vs передбачених значень
+    Візуалізація фактичних vs передбачених значень.
+    Якщо точок більше за density_threshold, обидві панелі малюються як густина.
     
     Args:
         y_true: фактичні значення
@@ -314,16 +786,32 @@ def plot_model_predictions(y_true: np.ndarray,
         title: заголовок графіка
         save: чи зберігати графік
         filename: назва файлу
+        density_threshold: поріг кількості точок (за замовчуванням DENSITY_PLOT_THRESHOLD)
+        sample_size: кількість точок поверх графіка густини (0 - без точок)
     """
     from sklearn.metrics import r2_score, mean_squared_error
     
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    density = len(y_true) > _density_threshold(density_threshold)
+    
+    cache_key = _render_cache_key(
+        'plot_model_predictions',
+        np.column_stack([y_true, y_pred]),
+        title=title,
+        density=density,
+        sample_size=sample_size,
+    )
+    if save and _reuse_cached_figure(filename, cache_key):
+        return
+    
     r2 = r2_score(y_true, y_pred)
     rmse = np.sqrt(mean_squared_error(y_true, y_pred))
     
     fig, axes = plt.subplots(1, 2, figsize=(15, 6))
     
     # Scatter plot
-    axes[0].scatter(y_true, y_pred, alpha=0.5, s=50)
+    _draw_points(axes[0], y_true, y_pred, density, sample_size=sample_size)
     axes[0].plot([y_true.min(), y_true.max()], 
                  [y_true.min(), y_true.max()], 
                  'r--', lw=2, label='Perfect prediction')
@@ -335,7 +823,7 @@ def plot_model_predictions(y_true: np.ndarray,
     
     # Residuals
     residuals = y_true - y_pred
-    axes[1].scatter(y_pred, residuals, alpha=0.5, s=50)
+    _draw_points(axes[1], y_pred, residuals, density, sample_size=sample_size)
     axes[1].axhline(y=0, color='r', linestyle='--', lw=2)
     axes[1].set_xlabel('Predicted values')
     axes[1].set_ylabel('Residuals')
@@ -345,13 +833,12 @@ def plot_model_predictions(y_true: np.ndarray,
     plt.tight_layout()
     
     if save:
-        filepath = get_figures_path() / filename
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, filename, cache_key)
 
     _finalize_plot(fig)
 
 
+@profiled
 def plot_grouped_comparison(df: pd.DataFrame,
                            group_col: str,
                            value_col: str,
@@ -370,6 +857,12 @@ def plot_grouped_comparison(df: pd.DataFrame,
         filename: назва файлу
     """
     grouped = df.groupby(group_col)[value_col].mean().sort_values(ascending=False).head(top_n)
+    fname = filename or f'grouped_{group_col}_{value_col}'.replace(' ', '_') + '.png'
+    
+    cache_key = _render_cache_key('plot_grouped_comparison', grouped,
+                                  group_col=group_col, value_col=value_col, top_n=top_n)
+    if save and _reuse_cached_figure(fname, cache_key):
+        return
     
     fig, ax = plt.subplots(figsize=(10, max(6, top_n * 0.4)))
     bars = ax.barh(range(len(grouped)), grouped.values)
@@ -394,14 +887,223 @@ def plot_grouped_comparison(df: pd.DataFrame,
     plt.tight_layout()
     
     if save:
-        fname = filename or f'grouped_{group_col}_{value_col}'.replace(' ', '_') + '.png'
-        filepath = get_figures_path() / fname
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        print(f"✓ Збережено: {filepath}")
+        _save_figure(fig, fname, cache_key)
 
     _finalize_plot(fig)
 
 
+class FigureJob(NamedTuple):
+    """
+    Опис графіка для планувальника render_figures
+
+    Attributes:
+        plot: назва функції plot_* з цього модуля
+        filename: назва файлу для збереження
+        kwargs: додаткові аргументи функції
+    """
+    plot: str
+    filename: str
+    kwargs: Optional[Dict] = None
+
+
+# Функції, що не приймають DataFrame першим аргументом
+_PLOTS_WITHOUT_DATA = {'plot_feature_importance', 'plot_model_predictions'}
+
+# DataFrame для воркерів: успадковується при fork або передається один раз на процес
+_RENDER_SHARED: Dict = {}
+
+
+def _init_render_worker(df: Optional[pd.DataFrame], style: str) -> None:
+    """
+    Ініціалізація процесу рендерингу: headless-режим, стиль та спільні дані
+    """
+    os.environ['PLOT_SHOW'] = '0'
+    plt.switch_backend('Agg')
+    if df is not None:
+        _RENDER_SHARED['df'] = df
+    setup_plot_style(style)
+
+
+def _render_job(job: FigureJob) -> Dict:
+    """
+    Рендеринг одного графіка з вимірюванням часу
+    """
+    plot_func = globals()[job.plot]
+    kwargs = dict(job.kwargs or {})
+    filepath = get_figures_path() / job.filename
+
+    hits_before = _RENDER_CACHE_STATS['hits']
+    misses_before = _RENDER_CACHE_STATS['misses']
+    render_start_ns = time.time_ns()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        if job.plot in _PLOTS_WITHOUT_DATA:
+            plot_func(save=True, filename=job.filename, **kwargs)
+        else:
+            plot_func(_RENDER_SHARED['df'], save=True, filename=job.filename, **kwargs)
+        status = None
+        error = None
+    except Exception as e:
+        status = 'error'
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        plt.close('all')
+
+    cache = None
+    if _RENDER_CACHE_STATS['hits'] > hits_before:
+        cache = 'hit'
+    elif _RENDER_CACHE_STATS['misses'] > misses_before:
+        cache = 'miss'
+
+    if status is None:
+        # PNG з попереднього запуску не рахується: файл має бути з кешу або записаний зараз
+        try:
+            fresh = cache == 'hit' or filepath.stat().st_mtime_ns >= render_start_ns
+        except OSError:
+            fresh = False
+        status = 'ok' if fresh else 'skipped'
+
+    return {
+        'name': job.filename,
+        'plot': job.plot,
+        'status': status,
+        'cache': cache,
+        'error': error,
+        'seconds': round(time.perf_counter() - wall_start, 4),
+        'cpu_seconds': round(time.process_time() - cpu_start, 4),
+        'pid': os.getpid(),
+    }
+
+
+def render_figures(df: pd.DataFrame,
+                   jobs: List[FigureJob],
+                   max_workers: Optional[int] = None,
+                   style: str = 'seaborn-v0_8',
+                   manifest_name: str = 'render_manifest.json') -> Dict:
+    """
+    Паралельний рендеринг списку графіків у пулі процесів
+
+    DataFrame не серіалізується для кожного графіка: при старті через fork
+    воркери успадковують його з пам'яті батьківського процесу, інакше він
+    передається один раз на воркер. Час кожного графіка та статус кешу
+    (hit/miss) записуються в маніфест у папці графіків, версії графіків
+    (мініатюра, екранна, оригінал) - у figures_manifest.json.
+
+    Args:
+        df: DataFrame з даними
+        jobs: список FigureJob
+        max_workers: кількість процесів (None - усі ядра, 1 - у поточному процесі)
+        style: стиль matplotlib
+        manifest_name: назва файлу маніфесту
+
+    Returns:
+        Словник маніфесту рендерингу
+    """
+    import json
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    for job in jobs:
+        if not job.plot.startswith('plot_') or not callable(globals().get(job.plot)):
+            raise ValueError(f"Unknown plot function '{job.plot}'")
+
+    workers = min(max_workers or os.cpu_count() or 1, max(len(jobs), 1))
+    wall_start = time.perf_counter()
+
+    _RENDER_SHARED['df'] = df
+    try:
+        if workers <= 1:
+            previous_show = os.environ.get('PLOT_SHOW')
+            os.environ['PLOT_SHOW'] = '0'
+            try:
+                setup_plot_style(style)
+                figures = [_render_job(job) for job in jobs]
+            finally:
+                if previous_show is None:
+                    os.environ.pop('PLOT_SHOW', None)
+                else:
+                    os.environ['PLOT_SHOW'] = previous_show
+        else:
+            use_fork = 'fork' in multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('fork' if use_fork else None)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=context,
+                initializer=_init_render_worker,
+                initargs=(None if use_fork else df, style),
+            ) as executor:
+                figures = list(executor.map(_render_job, jobs))
+    finally:
+        _RENDER_SHARED.clear()
+
+    manifest = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'workers': workers,
+        'wall_seconds': round(time.perf_counter() - wall_start, 4),
+        'figures_seconds_total': round(sum(item['seconds'] for item in figures), 4),
+        'cache_hits': sum(1 for item in figures if item['cache'] == 'hit'),
+        'cache_misses': sum(1 for item in figures if item['cache'] == 'miss'),
+        'figures': figures,
+    }
+
+    # Атомарний запис: читачі не побачать частковий маніфест
+    manifest_path = get_figures_path() / manifest_name
+    tmp_path = manifest_path.with_name(f'.{manifest_path.name}.tmp')
+    with tmp_path.open('w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    write_figures_manifest()
+
+    failed = [item for item in figures if item['status'] == 'error']
+    for item in failed:
+        print(f"Помилка рендерингу {item['name']}: {item['error']}")
+    print(f"✓ Згенеровано графіків: {len(figures) - len(failed)} за {manifest['wall_seconds']:.2f} с "
+          f"(процесів: {workers}). Маніфест: {manifest_path}")
+
+    return manifest
+
+
+# Функції даних графіків для plot_* функцій (для export_chart_data)
+_CHART_DATA_BUILDERS = {
+    'plot_missing_values': missing_values_chart,
+    'plot_distribution': distribution_chart,
+    'plot_distributions': distributions_chart,
+    'plot_correlation_matrix': correlation_chart,
+    'plot_grouped_comparison': grouped_comparison_chart,
+}
+
+
+def export_chart_data(df: pd.DataFrame, jobs: List[FigureJob]) -> Dict[str, str]:
+    """
+    Експорт агрегованих даних графіків у JSON (для інтерактивних графіків у браузері).
+    Назва файлу збігається з назвою PNG (без розширення).
+
+    Args:
+        df: DataFrame з даними
+        jobs: список FigureJob (графіки без функції даних пропускаються)
+
+    Returns:
+        Словник: назва графіка -> шлях до JSON
+    """
+    import inspect
+
+    exported = {}
+    for job in jobs:
+        builder = _CHART_DATA_BUILDERS.get(job.plot)
+        if builder is None:
+            continue
+        # Параметри оформлення (figsize тощо) функціям даних не потрібні
+        accepted = inspect.signature(builder).parameters
+        kwargs = {key: value for key, value in (job.kwargs or {}).items() if key in accepted}
+
+        name = Path(job.filename).stem
+        exported[name] = str(write_chart_data(name, builder(df, **kwargs)))
+
+    print(f"✓ Експортовано даних графіків: {len(exported)} у {get_charts_path()}")
+    return exported
+
+
 if __name__ == "__main__":
     # Приклад використання
     import sys